@@ -2,6 +2,9 @@
 """
 Automated Image Optimization Script for Bespoke Bags Website
 Optimizes images by compressing them and converting to modern formats
+
+Encoding speed: installing pillow-simd in place of Pillow needs no code changes.
+If pyvips is installed, JPEG/PNG/WebP files are encoded with libvips instead.
 """
 
 import os
@@ -10,13 +13,136 @@ from PIL import Image
 import json
 from pathlib import Path
 import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import chain, repeat
+from image_utils import group_same_stem, link_or_copy, replace_file, scan_files
+
+try:
+    import pyvips
+except ImportError:
+    pyvips = None
+
+# Formats libvips can write directly; anything else goes through Pillow
+VIPS_FORMATS = {'.jpg', '.jpeg', '.png', '.webp'}
+
+# libwebp's cwebp encoder (SIMD, multi-threaded with -mt) is used for WebP output when on PATH
+CWEBP = shutil.which('cwebp')
+CWEBP_INPUTS = {'.jpg', '.jpeg', '.png', '.tif', '.tiff', '.webp'}
+
+def create_webp_version(img, webp_path, source_path=None):
+    """Create a WebP version, with cwebp from source_path if possible, else from the decoded image"""
+    if CWEBP and source_path is not None and source_path.suffix.lower() in CWEBP_INPUTS:
+        # -blend_alpha flattens transparency onto white, matching the Pillow path below
+        replace_file(webp_path, lambda path: subprocess.run(
+            [CWEBP, '-quiet', '-q', '85', '-mt', '-blend_alpha', '0xffffff', str(source_path), '-o', str(path)],
+            check=True, capture_output=True
+        ))
+        return
+    
+    # Convert RGBA to RGB for better WebP compression
+    if img.mode in ('RGBA', 'LA'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'RGBA':
+            background.paste(img, mask=img.split()[-1])
+        else:
+            background.paste(img)
+        img = background
+    
+    replace_file(webp_path, lambda path: img.save(path, 'WebP', quality=85, optimize=True))
+
+def optimize_with_vips(image_path, quality=85, create_webp=False):
+    """Optimize with libvips; returns True if a WebP version was written"""
+    suffix = image_path.suffix.lower()
+    # Decode once into memory so the pixels can be encoded twice
+    image = pyvips.Image.new_from_file(str(image_path), access='sequential').copy_memory()
+    
+    flattened = image.flatten(background=[255, 255, 255]) if image.hasalpha() else image
+    output = flattened if suffix in ('.jpg', '.jpeg') else image
+    # Encode to a buffer so the original is only replaced once encoding has succeeded
+    save_kwargs = {'compression': 9} if suffix == '.png' else {'Q': quality}
+    data = output.write_to_buffer(suffix, strip=True, **save_kwargs)
+    replace_file(image_path, lambda path: path.write_bytes(data))
+    
+    if create_webp and suffix != '.webp':
+        replace_file(image_path.with_suffix('.webp'), lambda path: flattened.write_to_file(str(path), Q=85, strip=True))
+        return True
+    return False
+
+def optimize_image_file(image_path, base_dir, quality=85, create_webp=False):
+    """Optimize a single image; module-level so it can run in a worker process.
+    
+    Returns a result dict that AutoImageOptimizer.record_result merges into the report.
+    """
+    result = {'path': str(image_path.relative_to(base_dir)), 'webp_created': False}
+    try:
+        original_size = image_path.stat().st_size
+        
+        if pyvips is not None and image_path.suffix.lower() in VIPS_FORMATS:
+            result['webp_created'] = optimize_with_vips(image_path, quality, create_webp)
+        else:
+            with Image.open(image_path) as img:
+                # Decode once; both the optimized original and the WebP copy reuse these pixels
+                img.load()
+                source = img
+                
+                # Convert RGBA to RGB if saving as JPEG
+                if img.mode in ('RGBA', 'LA', 'P') and image_path.suffix.lower() in ['.jpg', '.jpeg']:
+                    background = Image.new('RGB', img.size, (255, 255, 255))
+                    if img.mode == 'P':
+                        img = img.convert('RGBA')
+                    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+                    img = background
+                
+                # Optimize and save
+                save_kwargs = {
+                    'optimize': True,
+                    'quality': quality
+                }
+                
+                if image_path.suffix.lower() == '.png':
+                    save_kwargs = {'optimize': True}
+                
+                replace_file(image_path, lambda path: img.save(path, **save_kwargs))
+                
+                if create_webp and image_path.suffix.lower() != '.webp':
+                    try:
+                        create_webp_version(source, image_path.with_suffix('.webp'), image_path)
+                        result['webp_created'] = True
+                    except Exception as e:
+                        result['webp_error'] = str(e)
+        
+        stat = image_path.stat()
+        new_size = stat.st_size
+        size_reduction = original_size - new_size
+        
+        result['file_info'] = {
+            'path': result['path'],
+            'original_size': original_size,
+            'new_size': new_size,
+            'size_reduction': size_reduction,
+            'reduction_percentage': (size_reduction / original_size * 100) if original_size > 0 else 0,
+            'mtime_ns': stat.st_mtime_ns
+        }
+        
+    except Exception as e:
+        result['error'] = str(e)
+    
+    return result
+
+def optimize_image_group(image_paths, base_dir, quality=85, create_webp=False):
+    """Optimize same-stem images one after another in a single worker"""
+    return [optimize_image_file(image_path, base_dir, quality, create_webp) for image_path in image_paths]
 
 class AutoImageOptimizer:
     def __init__(self, base_dir):
         self.base_dir = Path(base_dir)
         self.images_dir = self.base_dir / 'images'
         self.backup_dir = self.base_dir / 'images_backup'
+        self.report_path = self.base_dir / 'image_optimization_report.json'
+        # Skip state lives in its own file: optimize_images.py writes the report path too
+        self.cache_path = self.base_dir / '.auto_optimize_cache.json'
         self.supported_formats = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'}
         self.optimization_report = {
             'timestamp': datetime.now().isoformat(),
@@ -25,6 +151,7 @@ class AutoImageOptimizer:
             'total_size_before': 0,
             'total_size_after': 0,
             'files_processed': [],
+            'files_skipped': [],
             'errors': []
         }
     
@@ -32,7 +159,9 @@ class AutoImageOptimizer:
         """Create backup of original images"""
         if not self.backup_dir.exists():
             print(f"Creating backup directory: {self.backup_dir}")
-            shutil.copytree(self.images_dir, self.backup_dir)
+            # Hardlink instead of copying: optimized files are written via replace_file,
+            # so the linked originals stay untouched
+            shutil.copytree(self.images_dir, self.backup_dir, copy_function=link_or_copy)
             print("✓ Backup created successfully")
         else:
             print("✓ Backup directory already exists")
@@ -44,95 +173,67 @@ class AutoImageOptimizer:
             print(f"Images directory not found: {self.images_dir}")
             return image_files
         
-        for file_path in self.images_dir.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in self.supported_formats:
-                image_files.append(file_path)
+        for path in scan_files(self.images_dir):
+            name = os.path.basename(path)
+            dot = name.rfind('.')
+            if dot > 0 and name[dot:].lower() in self.supported_formats:
+                image_files.append(Path(path))
         
         return image_files
     
-    def optimize_image(self, image_path, quality=85):
-        """Optimize a single image"""
+    def load_previous_results(self):
+        """Load the file entries this script recorded on its last run, indexed by path"""
         try:
-            original_size = image_path.stat().st_size
-            
-            with Image.open(image_path) as img:
-                # Convert RGBA to RGB if saving as JPEG
-                if img.mode in ('RGBA', 'LA', 'P') and image_path.suffix.lower() in ['.jpg', '.jpeg']:
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                    img = background
-                
-                # Optimize and save
-                save_kwargs = {
-                    'optimize': True,
-                    'quality': quality
-                }
-                
-                if image_path.suffix.lower() == '.png':
-                    save_kwargs = {'optimize': True}
-                
-                img.save(image_path, **save_kwargs)
-            
-            new_size = image_path.stat().st_size
-            size_reduction = original_size - new_size
-            
-            file_info = {
-                'path': str(image_path.relative_to(self.base_dir)),
-                'original_size': original_size,
-                'new_size': new_size,
-                'size_reduction': size_reduction,
-                'reduction_percentage': (size_reduction / original_size * 100) if original_size > 0 else 0
-            }
-            
-            self.optimization_report['files_processed'].append(file_info)
-            self.optimization_report['total_size_before'] += original_size
-            self.optimization_report['total_size_after'] += new_size
-            self.optimization_report['optimized_files'] += 1
-            
-            return True, size_reduction
-            
-        except Exception as e:
-            error_info = {
-                'path': str(image_path.relative_to(self.base_dir)),
-                'error': str(e)
-            }
-            self.optimization_report['errors'].append(error_info)
-            print(f"✗ Error optimizing {image_path.name}: {e}")
-            return False, 0
-    
-    def create_webp_versions(self, image_files):
-        """Create WebP versions of images"""
-        print("\nCreating WebP versions...")
-        webp_created = 0
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            return {}
         
-        for image_path in image_files:
-            if image_path.suffix.lower() == '.webp':
-                continue
-            
-            try:
-                webp_path = image_path.with_suffix('.webp')
-                
-                with Image.open(image_path) as img:
-                    # Convert RGBA to RGB for better WebP compression
-                    if img.mode in ('RGBA', 'LA'):
-                        background = Image.new('RGB', img.size, (255, 255, 255))
-                        if img.mode == 'RGBA':
-                            background.paste(img, mask=img.split()[-1])
-                        else:
-                            background.paste(img)
-                        img = background
-                    
-                    img.save(webp_path, 'WebP', quality=85, optimize=True)
-                    webp_created += 1
-                    print(f"✓ Created WebP: {webp_path.name}")
-                    
-            except Exception as e:
-                print(f"✗ Error creating WebP for {image_path.name}: {e}")
+        if not isinstance(previous, dict):
+            return {}
+        return {path: info for path, info in previous.items() if isinstance(info, dict) and 'mtime_ns' in info}
+    
+    def save_cache(self):
+        """Record every optimized or skipped file so the next run can skip it"""
+        entries = self.optimization_report['files_processed'] + self.optimization_report['files_skipped']
+        cache = {info['path']: info for info in entries}
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+    
+    def is_unchanged(self, image_path, previous):
+        """Check whether a file still has the size and mtime recorded after its last optimization"""
+        info = previous.get(str(image_path.relative_to(self.base_dir)))
+        if info is None:
+            return False
         
-        print(f"\n✓ Created {webp_created} WebP versions")
-        return webp_created
+        stat = image_path.stat()
+        if (stat.st_size, stat.st_mtime_ns) != (info['new_size'], info['mtime_ns']):
+            return False
+        
+        self.optimization_report['files_skipped'].append(info)
+        return True
+    
+    def record_result(self, result):
+        """Merge a worker result into the optimization report"""
+        if result.get('webp_error'):
+            print(f"✗ Error creating WebP for {Path(result['path']).stem}.webp: {result['webp_error']}")
+        
+        if 'error' in result:
+            self.optimization_report['errors'].append({'path': result['path'], 'error': result['error']})
+            print(f"✗ Error optimizing {Path(result['path']).name}: {result['error']}")
+            return False, 0, result['webp_created']
+        
+        file_info = result['file_info']
+        self.optimization_report['files_processed'].append(file_info)
+        self.optimization_report['total_size_before'] += file_info['original_size']
+        self.optimization_report['total_size_after'] += file_info['new_size']
+        self.optimization_report['optimized_files'] += 1
+        
+        return True, file_info['size_reduction'], result['webp_created']
+    
+    def optimize_image(self, image_path, quality=85, create_webp=False):
+        """Optimize a single image, optionally writing its WebP version from the same decoded pixels"""
+        return self.record_result(optimize_image_file(image_path, self.base_dir, quality, create_webp))
     
     def generate_report(self):
         """Generate optimization report"""
@@ -144,6 +245,7 @@ class AutoImageOptimizer:
         print("="*50)
         print(f"Total files found: {self.optimization_report['total_files']}")
         print(f"Files optimized: {self.optimization_report['optimized_files']}")
+        print(f"Files skipped (unchanged): {len(self.optimization_report['files_skipped'])}")
         print(f"Errors encountered: {len(self.optimization_report['errors'])}")
         print(f"\nSize reduction:")
         print(f"  Before: {self.optimization_report['total_size_before']:,} bytes")
@@ -151,11 +253,10 @@ class AutoImageOptimizer:
         print(f"  Saved:  {total_reduction:,} bytes ({reduction_percentage:.1f}%)")
         
         # Save detailed report
-        report_path = self.base_dir / 'image_optimization_report.json'
-        with open(report_path, 'w', encoding='utf-8') as f:
+        with open(self.report_path, 'w', encoding='utf-8') as f:
             json.dump(self.optimization_report, f, indent=2, ensure_ascii=False)
         
-        print(f"\n✓ Detailed report saved to: {report_path}")
+        print(f"\n✓ Detailed report saved to: {self.report_path}")
     
     def run_optimization(self):
         """Run the complete optimization process"""
@@ -175,24 +276,43 @@ class AutoImageOptimizer:
         
         print(f"\nFound {len(image_files)} image files to optimize")
         
-        # Optimize images
-        print("\nOptimizing images...")
+        # Skip files left untouched since the previous run
+        previous = self.load_previous_results()
+        image_files = [image_path for image_path in image_files if not self.is_unchanged(image_path, previous)]
+        if self.optimization_report['files_skipped']:
+            print(f"Skipping {len(self.optimization_report['files_skipped'])} files unchanged since the last run")
+        
+        # Optimize images and create WebP versions in a single decode per file
+        print("\nOptimizing images and creating WebP versions...")
         total_saved = 0
+        webp_created = 0
         
-        for i, image_path in enumerate(image_files, 1):
-            print(f"[{i}/{len(image_files)}] Optimizing {image_path.name}...", end=" ")
-            success, saved = self.optimize_image(image_path)
-            if success:
-                total_saved += saved
-                print(f"✓ Saved {saved:,} bytes")
-            else:
-                print("✗ Failed")
+        # Same-stem files share their WebP output, so each such group stays in one task
+        groups = group_same_stem(image_files, drop_webp=True)
+        pending = sum(len(paths) for paths in groups)
+        if pending < len(image_files):
+            print(f"Leaving {len(image_files) - pending} WebP files to the WebP step of their same-stem sources")
+        image_files = list(chain.from_iterable(groups))
         
-        # Create WebP versions
-        self.create_webp_versions(image_files)
+        # Groups are independent, so encode them across all cores and merge results in order
+        with ProcessPoolExecutor() as executor:
+            results = chain.from_iterable(executor.map(optimize_image_group, groups, repeat(self.base_dir),
+                                                       repeat(85), repeat(True), chunksize=4))
+            for i, (image_path, result) in enumerate(zip(image_files, results), 1):
+                print(f"[{i}/{len(image_files)}] Optimizing {image_path.name}...", end=" ")
+                success, saved, webp = self.record_result(result)
+                if success:
+                    total_saved += saved
+                    print(f"✓ Saved {saved:,} bytes" + (" + WebP" if webp else ""))
+                else:
+                    print("✗ Failed")
+                webp_created += webp
+        
+        print(f"\n✓ Created {webp_created} WebP versions")
         
         # Generate report
         self.generate_report()
+        self.save_cache()
         
         print("\n🎉 Image optimization completed!")
 
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+文件读写公共模块
+各修复脚本共用的HTML文件遍历与原子写入逻辑
+"""
+
+import mmap
+import os
+import tempfile
+
+# 遍历时跳过的目录
+SKIP_DIRS = {'__pycache__', 'node_modules'}
+
+def iter_html_files(root):
+    """用 os.scandir 递归产出HTML文件路径，跳过隐藏目录和 SKIP_DIRS"""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if not entry.name.startswith('.') and entry.name not in SKIP_DIRS:
+                    yield from iter_html_files(entry.path)
+            elif entry.is_file() and entry.name.lower().endswith('.html'):
+                yield entry.path
+
+def collect_site_paths(root_dir):
+    """一次遍历收集站点内所有文件和目录的相对路径，内部链接检查改为集合查找"""
+    site_files = set()
+    site_dirs = {os.curdir}
+    for root, dirs, files in os.walk(root_dir):
+        rel_root = os.path.relpath(root, root_dir)
+        site_dirs.update(os.path.normpath(os.path.join(rel_root, name)) for name in dirs)
+        site_files.update(os.path.normpath(os.path.join(rel_root, name)) for name in files)
+    return site_files, site_dirs
+
+def read_file_bytes(file_path):
+    """用 mmap 一次性读入文件内容（空文件无法映射，直接返回空字节串）"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return bytes(mm)
+
+# 大缓冲区减少大HTML文件写入时的系统调用次数
+WRITE_BUFFER_SIZE = 1 << 20
+
+def create_temp_file(file_path):
+    """在目标文件所在目录用 mkstemp 创建唯一命名的临时文件，返回 (fd, 路径)；同时写同一文件的进程不会共用临时文件"""
+    directory, name = os.path.split(file_path)
+    # mkstemp 在 Windows 上以 O_BINARY 打开，os.write 不会把 \n 写成 \r\n
+    return tempfile.mkstemp(dir=directory or os.curdir, prefix=f'.{name}.', suffix='.tmp')
+
+def keep_file_mode(tmp_path, file_path):
+    """mkstemp 创建的文件只有所有者可读写，替换前沿用原文件的权限（新文件用644）"""
+    try:
+        mode = os.stat(file_path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    os.chmod(tmp_path, mode)
+
+def write_text_atomic(file_path, text):
+    """先写入临时文件再用 os.replace 替换，写入中途崩溃不会损坏原文件"""
+    fd, tmp_path = create_temp_file(file_path)
+    try:
+        with open(fd, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(text)
+        keep_file_mode(tmp_path, file_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_bytes_atomic(file_path, data):
+    """已编码的内容直接用 os.write 写入临时文件再替换，绕过Python文件对象的缓冲层"""
+    fd, tmp_path = create_temp_file(file_path)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        keep_file_mode(tmp_path, file_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -5,20 +5,20 @@
 """
 
 import os
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
+from file_utils import iter_html_files
+from seo_checks import load_seo_data
 
 def check_seo_issues(file_path):
     """检查单个HTML文件的SEO问题"""
     issues = []
     
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        soup = BeautifulSoup(content, 'html.parser')
+        present, found = load_seo_data(file_path, errors='ignore')
+        meta = found['meta']
         
         # 检查基本SEO元素
-        title = soup.find('title')
+        title = found['title']
         if not title or not title.get_text().strip():
             issues.append('缺少title标签')
         elif len(title.get_text().strip()) > 60:
@@ -27,7 +27,7 @@ def check_seo_issues(file_path):
             issues.append('标题过短')
         
         # 检查meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        meta_desc = meta.get('description')
         if not meta_desc or not meta_desc.get('content', '').strip():
             issues.append('缺少meta description')
         elif len(meta_desc.get('content', '').strip()) > 160:
@@ -36,60 +36,47 @@ def check_seo_issues(file_path):
             issues.append('描述过短')
         
         # 检查H1标签
-        h1_tags = soup.find_all('h1')
-        if not h1_tags:
+        h1_count = found['h1_count']
+        if not h1_count:
             issues.append('缺少H1标签')
-        elif len(h1_tags) > 1:
+        elif h1_count > 1:
             issues.append('H1标签过多')
         
         # 检查canonical链接
-        canonical = soup.find('link', attrs={'rel': 'canonical'})
-        if not canonical:
+        if 'canonical' not in present:
             issues.append('缺少canonical链接')
         
         # 检查viewport设置
-        viewport = soup.find('meta', attrs={'name': 'viewport'})
-        if not viewport:
+        if 'viewport' not in present:
             issues.append('缺少viewport设置')
         
         # 检查meta keywords
-        keywords = soup.find('meta', attrs={'name': 'keywords'})
+        keywords = meta.get('keywords')
         if not keywords or not keywords.get('content', '').strip():
             issues.append('缺少meta keywords')
         
         # 检查Open Graph标签
-        og_title = soup.find('meta', attrs={'property': 'og:title'})
-        og_desc = soup.find('meta', attrs={'property': 'og:description'})
-        og_url = soup.find('meta', attrs={'property': 'og:url'})
-        og_image = soup.find('meta', attrs={'property': 'og:image'})
-        
-        if not og_title:
+        if 'og:title' not in present:
             issues.append('缺少og:title')
-        if not og_desc:
+        if 'og:description' not in present:
             issues.append('缺少og:description')
-        if not og_url:
+        if 'og:url' not in present:
             issues.append('缺少og:url')
-        if not og_image:
+        if 'og:image' not in present:
             issues.append('缺少og:image')
         
         # 检查Twitter Card标签
-        twitter_card = soup.find('meta', attrs={'name': 'twitter:card'})
-        twitter_title = soup.find('meta', attrs={'name': 'twitter:title'})
-        twitter_desc = soup.find('meta', attrs={'name': 'twitter:description'})
-        twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
-        
-        if not twitter_card:
+        if 'twitter:card' not in present:
             issues.append('缺少Twitter卡片')
-        if not twitter_title:
+        if 'twitter:title' not in present:
             issues.append('缺少Twitter标题')
-        if not twitter_desc:
+        if 'twitter:description' not in present:
             issues.append('缺少Twitter描述')
-        if not twitter_image:
+        if 'twitter:image' not in present:
             issues.append('缺少Twitter图片')
         
         # 检查JSON-LD结构化数据
-        json_ld = soup.find('script', attrs={'type': 'application/ld+json'})
-        if not json_ld:
+        if 'json_ld' not in present:
             issues.append('缺少JSON-LD结构化数据')
         
     except Exception as e:
@@ -106,14 +93,14 @@ def main():
     print("=" * 50)
     
     # 遍历所有HTML文件
-    for root, dirs, files in os.walk(website_dir):
-        for file in files:
-            if file.endswith('.html'):
-                file_path = os.path.join(root, file)
-                issues = check_seo_issues(file_path)
-                
-                if issues:
-                    problem_files.append((file_path, issues))
+    html_files = list(iter_html_files(website_dir))
+    
+    # 多进程并行检查，结果按文件顺序返回
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(check_seo_issues, html_files, chunksize=16)
+        for file_path, issues in zip(html_files, results):
+            if issues:
+                problem_files.append((file_path, issues))
     
     # 输出有问题的文件
     if problem_files:
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SEO综合修复脚本
+每个HTML文件只读写一次：先修复URL中的反斜杠，再补全缺少的SEO标签
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from file_utils import iter_html_files, read_file_bytes, write_bytes_atomic
+from fix_seo_issues import Fix, SEOFixer, fix_seo_content, get_html_parser
+from fix_seo_urls import fix_url_bytes
+
+def fix_file(file_path, root_dir):
+    """在同一份内存内容上依次做URL修复和SEO标签补全，返回 (相对路径, 修复列表, 错误信息)"""
+    try:
+        data = read_file_bytes(file_path)
+        relative_path = os.path.relpath(file_path, root_dir)
+        
+        # URL修复在前，直接作用于原始字节；SEO标签补全基于修复后的内容判断
+        data, url_fix_count = fix_url_bytes(data)
+        content, fixes_applied = fix_seo_content(data.decode('utf-8'), relative_path)
+        
+        # 两步都完成后只写回一次；只修复了URL时直接写回字节，省去重新编码
+        if fixes_applied:
+            write_bytes_atomic(file_path, content.encode('utf-8'))
+        elif url_fix_count:
+            write_bytes_atomic(file_path, data)
+        
+        if url_fix_count:
+            fixes_applied.insert(0, Fix.URL_FORMAT)
+        
+        return relative_path, fixes_applied, None
+        
+    except Exception as e:
+        return None, [], f"修复文件 {file_path} 时出错: {e}"
+
+def main():
+    root_dir = os.getcwd()
+    fixer = SEOFixer(root_dir)
+    
+    print("开始SEO综合修复...")
+    html_files = list(iter_html_files(root_dir))
+    
+    with ProcessPoolExecutor(initializer=get_html_parser) as executor:
+        for result in executor.map(fix_file, html_files, repeat(root_dir), chunksize=32):
+            fixer.record_file_result(*result)
+    
+    fixer.generate_report()
+    
+    print("\nSEO综合修复完成！")
+
+if __name__ == '__main__':
+    main()
@@ -9,17 +9,94 @@
 
 import os
 import re
-from bs4 import BeautifulSoup
-import random
+import sys
+from bs4 import BeautifulSoup, NavigableString
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import cycle, repeat
+from file_utils import write_text_atomic
 
+# 图片容器的class匹配（bs4 用 search 匹配，无需前后的 .*）
+IMAGE_CLASS_RE = re.compile(r'image|photo|picture')
+
+# 追加到博客首页 <style> 中的配图样式，注释行同时作为已追加的标记
+BLOG_IMAGE_CSS_MARKER = '/* 修复博客配图显示问题 */'
+BLOG_IMAGE_CSS = """
+    /* 修复博客配图显示问题 */
+    .blog-image {
+        background-size: cover !important;
+        background-position: center !important;
+        background-repeat: no-repeat !important;
+        height: 200px !important;
+        border-radius: 8px 8px 0 0;
+    }
+    
+    .featured-article-main .article-image {
+        background-size: cover !important;
+        background-position: center !important;
+        background-repeat: no-repeat !important;
+        height: 300px !important;
+        border-radius: 8px;
+    }
+    
+    .featured-article-small .article-image {
+        background-size: cover !important;
+        background-position: center !important;
+        background-repeat: no-repeat !important;
+        height: 120px !important;
+        border-radius: 8px;
+    }
+    
+    /* 确保配图在不同屏幕尺寸下都能完整显示 */
+    @media (max-width: 768px) {
+        .blog-image {
+            height: 180px !important;
+        }
+        .featured-article-main .article-image {
+            height: 250px !important;
+        }
+        .featured-article-small .article-image {
+            height: 100px !important;
+        }
+    }
+    """
+
+# 追加到其他页面 <style> 中的配图样式
+PAGE_IMAGE_CSS_MARKER = '/* 页面配图优化 */'
+PAGE_IMAGE_CSS = """
+        /* 页面配图优化 */
+        .hero {
+            min-height: 400px;
+            background-size: cover !important;
+            background-position: center !important;
+            background-repeat: no-repeat !important;
+        }
+        
+        @media (max-width: 768px) {
+            .hero {
+                min-height: 300px;
+            }
+        }
+        """
+
+@lru_cache(maxsize=None)
 def get_available_images(images_dir):
-    """获取可用的图片列表"""
+    """获取可用的图片列表（按目录缓存，返回不可变的元组）"""
     images = []
     if os.path.exists(images_dir):
-        for file in os.listdir(images_dir):
-            if file.endswith(('.webp', '.jpg', '.jpeg', '.png')):
-                images.append(file)
-    return sorted(images)
+        with os.scandir(images_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(('.webp', '.jpg', '.jpeg', '.png')):
+                    images.append(entry.name)
+    return tuple(sorted(images))
+
+def page_image_cycle(available_images, file_path):
+    """按页面文件名确定起点轮换图片，重复运行或多进程分配时结果都相同"""
+    if not available_images:
+        return iter(())
+    start = zlib.crc32(os.path.basename(file_path).encode('utf-8')) % len(available_images)
+    return cycle(available_images[start:] + available_images[:start])
 
 def fix_blog_index_images(file_path, images_dir):
     """修复博客首页的配图问题"""
@@ -28,7 +105,7 @@ def fix_blog_index_images(file_path, images_dir):
     with open(file_path, 'r', encoding='utf-8') as f:
         content = f.read()
     
-    soup = BeautifulSoup(content, 'html.parser')
+    soup = BeautifulSoup(content, 'lxml')
     available_images = get_available_images(images_dir)
     
     # 修复缺少配图的文章
@@ -41,6 +118,7 @@ def fix_blog_index_images(file_path, images_dir):
     # 为缺少配图的文章添加配图
     blog_cards = soup.find_all('article', class_='blog-card')
     image_index = 0
+    modified = False
     
     for card in blog_cards:
         blog_image = card.find('div', class_='blog-image')
@@ -51,6 +129,7 @@ def fix_blog_index_images(file_path, images_dir):
                 if image_index < len(available_images):
                     new_image = available_images[image_index % len(available_images)]
                     blog_image['style'] = f"background-image: url('../images/{new_image}');"
+                    modified = True
                     print(f"为文章添加配图: {new_image}")
                     image_index += 1
     
@@ -58,59 +137,22 @@ def fix_blog_index_images(file_path, images_dir):
     style_tag = soup.find('style')
     if not style_tag:
         style_tag = soup.new_tag('style')
-        head = soup.find('head')
+        head = soup.head
         if head:
             head.append(style_tag)
     
-    # 添加或更新CSS样式
-    css_fixes = """
-    /* 修复博客配图显示问题 */
-    .blog-image {
-        background-size: cover !important;
-        background-position: center !important;
-        background-repeat: no-repeat !important;
-        height: 200px !important;
-        border-radius: 8px 8px 0 0;
-    }
-    
-    .featured-article-main .article-image {
-        background-size: cover !important;
-        background-position: center !important;
-        background-repeat: no-repeat !important;
-        height: 300px !important;
-        border-radius: 8px;
-    }
-    
-    .featured-article-small .article-image {
-        background-size: cover !important;
-        background-position: center !important;
-        background-repeat: no-repeat !important;
-        height: 120px !important;
-        border-radius: 8px;
-    }
-    
-    /* 确保配图在不同屏幕尺寸下都能完整显示 */
-    @media (max-width: 768px) {
-        .blog-image {
-            height: 180px !important;
-        }
-        .featured-article-main .article-image {
-            height: 250px !important;
-        }
-        .featured-article-small .article-image {
-            height: 100px !important;
-        }
-    }
-    """
+    # 已包含修复样式时不再重复追加
+    if BLOG_IMAGE_CSS_MARKER not in style_tag.get_text():
+        style_tag.append(NavigableString(BLOG_IMAGE_CSS))
+        modified = True
     
-    if style_tag.string:
-        style_tag.string += css_fixes
-    else:
-        style_tag.string = css_fixes
+    # 没有实际修改时跳过序列化和写入
+    if not modified:
+        print(f"博客首页配图无需修改: {file_path}")
+        return
     
     # 保存修改后的文件
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(str(soup))
+    write_text_atomic(file_path, str(soup))
     
     print(f"博客首页配图修复完成: {file_path}")
 
@@ -126,21 +168,28 @@ def add_images_to_other_pages(root_dir, images_dir):
     # 需要添加配图的页面目录
     page_dirs = ['about', 'services', 'products', 'contact']
     
+    html_files = []
     for page_dir in page_dirs:
         dir_path = os.path.join(root_dir, page_dir)
         if os.path.exists(dir_path):
             for file in os.listdir(dir_path):
                 if file.endswith('.html'):
-                    file_path = os.path.join(dir_path, file)
-                    add_image_to_page(file_path, available_images, images_dir)
+                    html_files.append(os.path.join(dir_path, file))
+    
+    # 各页面相互独立，多进程并行处理
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(add_image_to_page, html_files, repeat(available_images), repeat(images_dir), chunksize=8))
 
 def add_image_to_page(file_path, available_images, images_dir):
     """为单个页面添加配图"""
+    logs = []
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        soup = BeautifulSoup(content, 'html.parser')
+        soup = BeautifulSoup(content, 'lxml')
+        modified = False
+        images = page_image_cycle(available_images, file_path)
         
         # 检查是否已经有hero section的背景图
         hero_section = soup.find('section', class_='hero')
@@ -148,59 +197,52 @@ def add_image_to_page(file_path, available_images, images_dir):
             style = hero_section.get('style', '')
             if 'background-image' not in style:
                 # 添加背景图
-                random_image = random.choice(available_images)
-                new_style = f"background-image: linear-gradient(rgba(0,0,0,0.4), rgba(0,0,0,0.4)), url('../images/{random_image}'); background-size: cover; background-position: center;"
+                page_image = next(images)
+                new_style = f"background-image: linear-gradient(rgba(0,0,0,0.4), rgba(0,0,0,0.4)), url('../images/{page_image}'); background-size: cover; background-position: center;"
                 if style:
                     hero_section['style'] = style + '; ' + new_style
                 else:
                     hero_section['style'] = new_style
-                print(f"为页面 {file_path} 添加hero背景图: {random_image}")
+                modified = True
+                logs.append(f"为页面 {file_path} 添加hero背景图: {page_image}")
         
         # 查找其他可能需要配图的元素
-        image_containers = soup.find_all(['div', 'section'], class_=re.compile(r'.*image.*|.*photo.*|.*picture.*'))
+        image_containers = soup.find_all(['div', 'section'], class_=IMAGE_CLASS_RE)
         for container in image_containers:
             if not container.find('img') and 'background-image' not in container.get('style', ''):
-                random_image = random.choice(available_images)
-                container['style'] = f"background-image: url('../images/{random_image}'); background-size: cover; background-position: center; min-height: 300px;"
-                print(f"为容器添加背景图: {random_image}")
+                page_image = next(images)
+                container['style'] = f"background-image: url('../images/{page_image}'); background-size: cover; background-position: center; min-height: 300px;"
+                modified = True
+                logs.append(f"为容器添加背景图: {page_image}")
         
         # 添加CSS样式确保图片适当显示
         style_tag = soup.find('style')
         if not style_tag:
             style_tag = soup.new_tag('style')
-            head = soup.find('head')
+            head = soup.head
             if head:
                 head.append(style_tag)
         
-        css_additions = """
-        /* 页面配图优化 */
-        .hero {
-            min-height: 400px;
-            background-size: cover !important;
-            background-position: center !important;
-            background-repeat: no-repeat !important;
-        }
-        
-        @media (max-width: 768px) {
-            .hero {
-                min-height: 300px;
-            }
-        }
-        """
+        # 已包含优化样式时不再重复追加
+        if PAGE_IMAGE_CSS_MARKER not in style_tag.get_text():
+            style_tag.append(NavigableString(PAGE_IMAGE_CSS))
+            modified = True
         
-        if style_tag.string:
-            style_tag.string += css_additions
-        else:
-            style_tag.string = css_additions
+        # 没有实际修改时跳过序列化和写入
+        if not modified:
+            return
         
         # 保存修改后的文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(str(soup))
+        write_text_atomic(file_path, str(soup))
         
-        print(f"页面配图添加完成: {file_path}")
+        logs.append(f"页面配图添加完成: {file_path}")
         
     except Exception as e:
-        print(f"处理页面 {file_path} 时出错: {e}")
+        logs.append(f"处理页面 {file_path} 时出错: {e}")
+    finally:
+        # 子进程中每个页面的输出合并成一次写入，避免与其他进程交错
+        if logs:
+            sys.stdout.write('\n'.join(logs) + '\n')
 
 def main():
     """主函数"""
@@ -6,10 +6,63 @@
 """
 
 import os
-import re
-import json
-from bs4 import BeautifulSoup
-from collections import defaultdict
+from selectolax.lexbor import LexborHTMLParser
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from file_utils import iter_html_files, write_text_atomic
+
+def build_link_needles(link_fixes):
+    """生成预筛选用的字节串：包含其他键的键是多余的，只保留最短的那些"""
+    keys = sorted(link_fixes, key=len)
+    needles = []
+    for key in keys:
+        if not any(needle in key for needle in needles):
+            needles.append(key)
+    return tuple(needle.encode('utf-8') for needle in needles)
+
+def fix_links_in_file(file_path, link_fixes, needles=None):
+    """修复单个文件中的链接，返回 (修复数量, 输出信息)；模块级函数以便在子进程中运行"""
+    fixes = 0
+    messages = []
+    add_message = messages.append
+    if needles is None:
+        needles = build_link_needles(link_fixes)
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        
+        # 文件中不含任何待修复链接时无需解码和解析；待查字节串很少，逐个 in 查找即可
+        if not any(needle in data for needle in needles):
+            return fixes, messages
+        
+        content = data.decode('utf-8')
+        
+        # 只需改写属性，用C实现的lexbor解析器代替BeautifulSoup
+        tree = LexborHTMLParser(content)
+        
+        # 一次遍历同时修复href链接和src资源
+        for node in tree.css('a, link, img, script'):
+            if node.tag in ('a', 'link'):
+                attr, label = 'href', '链接'
+            else:
+                attr, label = 'src', '资源'
+            value = node.attributes.get(attr)
+            # 一次 get() 同时完成查找和取值
+            new_value = link_fixes.get(value) if value else None
+            if new_value is not None:
+                node.attrs[attr] = new_value
+                fixes += 1
+                add_message(f"  修复{label}: {value} -> {new_value}")
+        
+        if fixes:
+            # 保存修改后的文件
+            write_text_atomic(file_path, tree.html)
+        
+    except Exception as e:
+        messages.append(f"处理文件 {file_path} 时出错: {e}")
+        fixes = 0
+    
+    return fixes, messages
 
 class BrokenLinkFixer:
     def __init__(self, root_dir):
@@ -61,46 +114,18 @@ class BrokenLinkFixer:
             'luxury-travel-style-guide-2024.html': 'luxury-travel-bags-guide.html',
         }
     
+    def record_file_result(self, fixes, messages):
+        """输出单个文件的修复信息并累计统计"""
+        for message in messages:
+            print(message)
+        self.fixes_applied += fixes
+        if fixes:
+            self.files_modified += 1
+        return fixes > 0
+    
     def fix_file_links(self, file_path):
         """修复单个文件中的链接"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            original_content = content
-            soup = BeautifulSoup(content, 'html.parser')
-            modified = False
-            
-            # 修复href链接
-            for tag in soup.find_all(['a', 'link']):
-                href = tag.get('href')
-                if href and href in self.link_fixes:
-                    tag['href'] = self.link_fixes[href]
-                    modified = True
-                    self.fixes_applied += 1
-                    print(f"  修复链接: {href} -> {self.link_fixes[href]}")
-            
-            # 修复src链接
-            for tag in soup.find_all(['img', 'script']):
-                src = tag.get('src')
-                if src and src in self.link_fixes:
-                    tag['src'] = self.link_fixes[src]
-                    modified = True
-                    self.fixes_applied += 1
-                    print(f"  修复资源: {src} -> {self.link_fixes[src]}")
-            
-            if modified:
-                # 保存修改后的文件
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(str(soup))
-                self.files_modified += 1
-                return True
-            
-            return False
-            
-        except Exception as e:
-            print(f"处理文件 {file_path} 时出错: {e}")
-            return False
+        return self.record_file_result(*fix_links_in_file(file_path, self.link_fixes))
     
     def create_missing_blog_redirects(self):
         """为缺失的博客文章创建重定向页面"""
@@ -139,22 +164,18 @@ class BrokenLinkFixer:
     
     def fix_all_links(self):
         """修复所有HTML文件中的链接"""
-        html_files = []
-        for root, dirs, files in os.walk(self.root_dir):
-            # 跳过隐藏目录
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['__pycache__', 'node_modules']]
-            
-            for file in files:
-                if file.lower().endswith('.html'):
-                    file_path = os.path.join(root, file)
-                    html_files.append(file_path)
+        html_files = list(iter_html_files(self.root_dir))
         
         print(f"开始修复 {len(html_files)} 个HTML文件中的链接...")
         
-        for file_path in html_files:
-            rel_path = os.path.relpath(file_path, self.root_dir)
-            print(f"检查文件: {rel_path}")
-            self.fix_file_links(file_path)
+        # 各文件相互独立，多进程并行修复，按文件顺序汇总输出
+        with ProcessPoolExecutor() as executor:
+            needles = build_link_needles(self.link_fixes)
+            results = executor.map(fix_links_in_file, html_files, repeat(self.link_fixes), repeat(needles), chunksize=8)
+            for file_path, (fixes, messages) in zip(html_files, results):
+                rel_path = os.path.relpath(file_path, self.root_dir)
+                print(f"检查文件: {rel_path}")
+                self.record_file_result(fixes, messages)
         
         # 创建缺失的博客重定向页面
         print("\n创建缺失的博客文章重定向页面...")
@@ -2,106 +2,141 @@
 # -*- coding: utf-8 -*-
 """
 修复最后的SEO问题 - bespoke-bags.com
+与 fix_incomplete_html_files.py 的结构修复合并为单次解析、单次写入
 """
 
 import os
-from bs4 import BeautifulSoup
+import re
+import sys
+from bs4 import BeautifulSoup, SoupStrainer
+from fix_incomplete_html_files import PROBLEM_FILES, fix_incomplete_soup
+from file_utils import read_file_bytes, write_text_atomic
 
-def fix_final_issues():
-    """修复最后的SEO问题"""
+# 诊断阶段只解析 title 和 h1，需要修改时才完整解析
+DIAGNOSTIC_STRAINER = SoupStrainer(['title', 'h1'])
+BODY_TAG_RE = re.compile(r'<body[\s>]', re.IGNORECASE)
+
+def needs_fixing(content):
+    """用精简解析判断文件是否可能需要修复"""
+    if not BODY_TAG_RE.search(content):
+        return True
     
-    # 需要修复的文件列表
-    problem_files = [
-        './blog/customer-service-excellence.html',
-        './blog/luxury-cosmetic-bags-guide-2024.html', 
-        './blog/professional-laptop-bags-guide-2024-part2.html',
-        './products/carry-on-bags.html'
-    ]
+    soup = BeautifulSoup(content, 'lxml', parse_only=DIAGNOSTIC_STRAINER)
+    if not soup.find('h1'):
+        return True
     
-    fixed_count = 0
+    title_tag = soup.find('title')
+    title_text = title_tag.get_text().strip() if title_tag else ''
+    return bool(title_text) and not 30 <= len(title_text) <= 60
+
+def fix_final_soup(soup, file_path, logs):
+    """在已解析的文档上修复最后的SEO问题，输出信息追加到 logs，返回是否有修改"""
+    modified = False
     
-    print("开始修复最后的SEO问题...")
-    print("=" * 50)
+    # 常用节点只查找一次，后续检查复用
+    title_tag = soup.title
+    body = soup.body
     
-    for file_path in problem_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+    # 修复标题过短问题
+    if title_tag and title_tag.get_text().strip():
+        title_text = title_tag.get_text().strip()
+        if len(title_text) < 30:
+            # 扩展标题
+            if 'carry-on' in file_path.lower():
+                new_title = title_text + " | Premium Travel Bags | Bespoke Bags"
+            else:
+                new_title = title_text + " | Premium Bespoke Bags"
+            
+            title_tag.string = new_title
+            modified = True
+            logs.append(f"扩展标题: {file_path}")
+            logs.append(f"  原标题: {title_text}")
+            logs.append(f"  新标题: {new_title}")
+            
+            # 同步更新OG和Twitter标题
+            og_title = soup.find('meta', attrs={'property': 'og:title'})
+            if og_title:
+                og_title['content'] = new_title
             
-            soup = BeautifulSoup(content, 'html.parser')
-            modified = False
+            twitter_title = soup.find('meta', attrs={'name': 'twitter:title'})
+            if twitter_title:
+                twitter_title['content'] = new_title
+    
+    # 修复缺少H1标签问题
+    h1_tags = soup.find_all('h1')
+    if not h1_tags:
+        if body:
+            # 创建H1标签
+            h1 = soup.new_tag('h1')
             
-            # 修复标题过短问题
-            title_tag = soup.find('title')
+            # 从title获取H1内容
             if title_tag and title_tag.get_text().strip():
-                title_text = title_tag.get_text().strip()
-                if len(title_text) < 30:
-                    # 扩展标题
-                    if 'carry-on' in file_path.lower():
-                        new_title = title_text + " | Premium Travel Bags | Bespoke Bags"
-                    else:
-                        new_title = title_text + " | Premium Bespoke Bags"
-                    
-                    title_tag.string = new_title
-                    modified = True
-                    print(f"扩展标题: {file_path}")
-                    print(f"  原标题: {title_text}")
-                    print(f"  新标题: {new_title}")
-                    
-                    # 同步更新OG和Twitter标题
-                    og_title = soup.find('meta', attrs={'property': 'og:title'})
-                    if og_title:
-                        og_title['content'] = new_title
-                    
-                    twitter_title = soup.find('meta', attrs={'name': 'twitter:title'})
-                    if twitter_title:
-                        twitter_title['content'] = new_title
+                h1_text = title_tag.get_text().strip()
+                # 移除品牌后缀
+                h1_text = h1_text.replace(' | Premium Travel Bags | Bespoke Bags', '')
+                h1_text = h1_text.replace(' | Premium Bespoke Bags', '')
+                h1_text = h1_text.replace(' | Bespoke Bags', '')
+                h1.string = h1_text
+            else:
+                # 从文件名生成H1
+                filename = os.path.basename(file_path).replace('.html', '').replace('-', ' ').title()
+                h1.string = filename
             
-            # 修复缺少H1标签问题
-            h1_tags = soup.find_all('h1')
-            if not h1_tags:
-                body = soup.find('body')
-                if body:
-                    # 创建H1标签
-                    h1 = soup.new_tag('h1')
-                    
-                    # 从title获取H1内容
-                    title_tag = soup.find('title')
-                    if title_tag and title_tag.get_text().strip():
-                        h1_text = title_tag.get_text().strip()
-                        # 移除品牌后缀
-                        h1_text = h1_text.replace(' | Premium Travel Bags | Bespoke Bags', '')
-                        h1_text = h1_text.replace(' | Premium Bespoke Bags', '')
-                        h1_text = h1_text.replace(' | Bespoke Bags', '')
-                        h1.string = h1_text
-                    else:
-                        # 从文件名生成H1
-                        filename = os.path.basename(file_path).replace('.html', '').replace('-', ' ').title()
-                        h1.string = filename
-                    
-                    # 查找合适的位置插入H1
-                    # 优先插入到main标签中
-                    main_tag = soup.find('main')
-                    if main_tag:
-                        if main_tag.contents:
-                            main_tag.insert(0, h1)
-                        else:
-                            main_tag.append(h1)
-                    else:
-                        # 如果没有main标签，插入到body开头
-                        if body.contents:
-                            body.insert(0, h1)
-                        else:
-                            body.append(h1)
-                    
-                    modified = True
-                    print(f"添加H1标签: {file_path}")
-                    print(f"  H1内容: {h1.get_text()}")
+            # 查找合适的位置插入H1
+            # 优先插入到main标签中
+            main_tag = soup.find('main')
+            if main_tag:
+                if main_tag.contents:
+                    main_tag.insert(0, h1)
+                else:
+                    main_tag.append(h1)
+            else:
+                # 如果没有main标签，插入到body开头
+                if body.contents:
+                    body.insert(0, h1)
+                else:
+                    body.append(h1)
             
-            # 保存修改后的文件
-            if modified:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(str(soup))
+            modified = True
+            logs.append(f"添加H1标签: {file_path}")
+            logs.append(f"  H1内容: {h1.get_text()}")
+    
+    return modified
+
+def fix_all(file_path, data=None):
+    """解析一次文件，依次应用结构修复和SEO修复，有修改时只写入一次"""
+    if data is None:
+        data = read_file_bytes(file_path)
+    # 与文本模式读取一致：忽略非法字节并统一换行符
+    content = data.decode('utf-8', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+    
+    if not needs_fixing(content):
+        return False
+    
+    soup = BeautifulSoup(content, 'lxml')
+    logs = []
+    try:
+        modified = fix_incomplete_soup(soup, file_path, logs)
+        modified = fix_final_soup(soup, file_path, logs) or modified
+        
+        if modified:
+            write_text_atomic(file_path, str(soup))
+    finally:
+        # 每个文件的输出合并成一次写入
+        if logs:
+            sys.stdout.write('\n'.join(logs) + '\n')
+    return modified
+
+def fix_final_issues():
+    """修复不完整的HTML结构和最后的SEO问题"""
+    fixed_count = 0
+    
+    print("开始修复不完整的HTML文件和最后的SEO问题...")
+    print("=" * 50)
+    
+    for file_path in PROBLEM_FILES:
+        try:
+            if fix_all(file_path, read_file_bytes(file_path)):
                 fixed_count += 1
                 print(f"✅ 修复完成: {file_path}")
                 print()
@@ -8,7 +8,13 @@
 import os
 import re
 import glob
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
+from file_utils import write_bytes_atomic
+
+# 需要替换的图片引用
+IMG_SRC_RE = re.compile(rb'src="([^"]*\.(?:jpg|jpeg|png|gif|svg))"')
 
 def get_available_webp_images(images_dir):
     """获取所有可用的webp图片文件"""
@@ -56,39 +62,47 @@ def create_image_mapping(webp_files):
     
     return mapping, webp_index, used_webp
 
-def fix_html_file(file_path, mapping, webp_files, webp_index, used_webp):
-    """修复单个HTML文件中的图片路径"""
+def collect_image_names(file_path):
+    """第一遍：按出现顺序收集文件中引用的图片文件名"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open(file_path, 'rb') as f:
             content = f.read()
+        # 解码放在 try 内：非UTF-8的src只跳过该文件，不会让子进程异常中断整个 executor.map
+        return [os.path.basename(src.decode('utf-8')) for src in IMG_SRC_RE.findall(content)]
+    except Exception as e:
+        print(f'✗ 读取文件 {file_path} 时出错: {e}')
+        return []
+
+def assign_missing_mappings(image_names, mapping, webp_index, used_webp):
+    """第二遍：按出现顺序为尚无映射的图片分配webp文件"""
+    for img_filename in image_names:
+        if img_filename in mapping:
+            continue
         
-        original_content = content
-        changes_made = False
+        while f'bespoke-bags ({webp_index}).webp' in used_webp and webp_index <= 131:
+            webp_index += 1
         
-        # 查找所有图片引用
-        img_pattern = r'src="([^"]*\.(jpg|jpeg|png|gif|svg))"'
-        matches = re.findall(img_pattern, content)
+        # 超出范围的图片不记录映射，替换时使用第一个webp文件
+        if webp_index > 131:
+            break
         
-        for match in matches:
-            img_path = match[0]
-            img_filename = os.path.basename(img_path)
-            
-            # 检查是否已有映射
-            if img_filename in mapping:
-                replacement = mapping[img_filename]
-            else:
-                # 为新图片创建映射
-                while f'bespoke-bags ({webp_index}).webp' in used_webp and webp_index <= 131:
-                    webp_index += 1
-                
-                if webp_index <= 131:
-                    replacement = f'bespoke-bags ({webp_index}).webp'
-                    mapping[img_filename] = replacement
-                    used_webp.add(replacement)
-                    webp_index += 1
-                else:
-                    # 如果没有更多webp文件，使用第一个
-                    replacement = 'bespoke-bags (1).webp'
+        replacement = f'bespoke-bags ({webp_index}).webp'
+        mapping[img_filename] = replacement
+        used_webp.add(replacement)
+        webp_index += 1
+    
+    return mapping
+
+def fix_html_file(file_path, mapping):
+    """第三遍：用已构建完成的映射修复单个HTML文件中的图片路径，返回 (是否修复, 输出信息)"""
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        
+        def replace_src(match):
+            img_path = match.group(1).decode('utf-8')
+            # 如果没有更多webp文件，使用第一个
+            replacement = mapping.get(os.path.basename(img_path), 'bespoke-bags (1).webp')
             
             # 构建新的路径
             img_dir = os.path.dirname(img_path)
@@ -97,24 +111,20 @@ def fix_html_file(file_path, mapping, webp_files, webp_index, used_webp):
             else:
                 new_path = replacement
             
-            # 替换内容
-            old_src = f'src="{img_path}"'
-            new_src = f'src="{new_path}"'
-            content = content.replace(old_src, new_src)
-            changes_made = True
+            return f'src="{new_path}"'.encode('utf-8')
+        
+        # 一次扫描替换所有图片引用
+        content, count = IMG_SRC_RE.subn(replace_src, content)
         
         # 如果有更改，写回文件
-        if changes_made:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f'✓ 修复了 {file_path}')
-            return True
+        if count:
+            write_bytes_atomic(file_path, content)
+            return True, f'✓ 修复了 {file_path}'
         else:
-            return False
+            return False, None
             
     except Exception as e:
-        print(f'✗ 处理文件 {file_path} 时出错: {e}')
-        return False
+        return False, f'✗ 处理文件 {file_path} 时出错: {e}'
 
 def main():
     """主函数"""
@@ -137,11 +147,18 @@ def main():
     
     print(f'找到 {len(html_files)} 个HTML文件')
     
-    # 修复每个文件
-    fixed_count = 0
-    for html_file in html_files:
-        if fix_html_file(html_file, mapping, webp_files, webp_index, used_webp):
-            fixed_count += 1
+    with ProcessPoolExecutor() as executor:
+        # 先收集所有引用的图片并一次性分配映射，之后各文件可以独立并行修复
+        for image_names in executor.map(collect_image_names, html_files, chunksize=8):
+            assign_missing_mappings(image_names, mapping, webp_index, used_webp)
+        
+        # 修复每个文件
+        fixed_count = 0
+        for fixed, message in executor.map(fix_html_file, html_files, repeat(mapping), chunksize=8):
+            if message:
+                print(message)
+            if fixed:
+                fixed_count += 1
     
     print(f'\n修复完成！共修复了 {fixed_count} 个文件')
     print(f'图片映射关系:')
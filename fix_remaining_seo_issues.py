@@ -6,8 +6,75 @@
 
 import os
 import re
-from bs4 import BeautifulSoup
+import sys
+from bs4 import BeautifulSoup, Doctype
 import json
+from html import unescape
+from concurrent.futures import ProcessPoolExecutor
+from file_utils import iter_html_files, write_text_atomic
+
+# 原始文件中是否带有html标签（lxml 解析后总会补全html标签，只能检查原文）
+HTML_TAG_RE = re.compile(r'<html[\s>]', re.IGNORECASE)
+
+# 新增的head标签拼接到原文的这个位置之前
+HEAD_CLOSE_RE = re.compile(r'</head\s*>', re.IGNORECASE)
+
+# 修复后的页面必然包含这些字符串；标题、描述和关键词另外检查长度
+FIXED_MARKERS = (
+    '<head', '<h1', 'name="viewport"', 'rel="canonical"',
+    'property="og:title"', 'property="og:description"', 'property="og:url"', 'property="og:image"',
+    'name="twitter:card"', 'name="twitter:title"', 'name="twitter:description"', 'name="twitter:image"',
+    'application/ld+json',
+)
+TITLE_TEXT_RE = re.compile(r'<title[^>]*>([^<]*)</title>', re.IGNORECASE)
+META_DESCRIPTION_RE = re.compile(r'<meta\b[^>]*\bname="description"[^>]*>', re.IGNORECASE)
+META_KEYWORDS_RE = re.compile(r'<meta\b[^>]*\bname="keywords"[^>]*>', re.IGNORECASE)
+CONTENT_ATTR_RE = re.compile(r'\bcontent="([^"]*)"')
+
+# JSON-LD结构化数据模板，与 json.dumps(..., ensure_ascii=False, indent=2) 的输出一致，只有三个字段随页面变化
+JSON_LD_TEMPLATE = """{{
+  "@context": "https://schema.org",
+  "@type": "WebPage",
+  "name": {name},
+  "description": {description},
+  "url": {url},
+  "publisher": {{
+    "@type": "Organization",
+    "name": "Bespoke Bags",
+    "url": "https://bespoke-bags.com"
+  }}
+}}"""
+
+# orjson 编码更快且默认不转义非ASCII字符，未安装时退回标准库，两者输出一致
+try:
+    import orjson
+    
+    def dump_json_string(value):
+        """把单个字段值编码为JSON字面量，用于填充 JSON_LD_TEMPLATE"""
+        return orjson.dumps(value).decode('utf-8')
+except ImportError:
+    def dump_json_string(value):
+        """把单个字段值编码为JSON字面量，用于填充 JSON_LD_TEMPLATE"""
+        return json.dumps(value, ensure_ascii=False)
+
+def meta_content(pattern, content):
+    """用正则取出第一个匹配的meta标签的content值，找不到时返回空字符串"""
+    tag = pattern.search(content)
+    value = CONTENT_ATTR_RE.search(tag.group(0)) if tag else None
+    return unescape(value.group(1)).strip() if value else ''
+
+def is_already_fixed(content):
+    """不解析文档，用字符串和正则判断页面是否已无需修复；不确定时返回False"""
+    if not HTML_TAG_RE.search(content):
+        return False
+    if not all(marker in content for marker in FIXED_MARKERS):
+        return False
+    
+    title_match = TITLE_TEXT_RE.search(content)
+    if not title_match or len(unescape(title_match.group(1)).strip()) < 30:
+        return False
+    
+    return len(meta_content(META_DESCRIPTION_RE, content)) >= 120 and bool(meta_content(META_KEYWORDS_RE, content))
 
 def generate_title_from_content(soup, file_path):
     """从内容生成标题"""
@@ -55,95 +122,151 @@ def generate_keywords_from_content(soup, file_path):
     
     return base_keywords
 
+def index_seo_tags(soup):
+    """一次遍历收集已有的SEO标签，每个键保留文档中最先出现的那个"""
+    existing = {}
+    for tag in soup.find_all(['title', 'meta', 'link', 'script']):
+        if tag.name == 'meta':
+            if tag.get('name'):
+                existing.setdefault(('name', tag['name']), tag)
+            if tag.get('property'):
+                existing.setdefault(('property', tag['property']), tag)
+        elif tag.name == 'link':
+            if 'canonical' in tag.get('rel', ()):
+                existing.setdefault('canonical', tag)
+        elif tag.name == 'script':
+            if tag.get('type') == 'application/ld+json':
+                existing.setdefault('json_ld', tag)
+        else:
+            existing.setdefault('title', tag)
+    return existing
+
 def fix_seo_issues(file_path):
     """修复单个HTML文件的SEO问题"""
+    logs = []
     try:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
         
-        soup = BeautifulSoup(content, 'html.parser')
+        # 重复运行时大部分页面已修复过，字符串检查通过就跳过解析
+        if is_already_fixed(content):
+            return False
+        
+        soup = BeautifulSoup(content, 'lxml')
         modified = False
+        # 只追加了head标签时可直接拼接原文；其他结构性修改需要重新序列化
+        restructured = False
         
         # 确保有html和head标签
-        if not soup.find('html'):
-            # 如果没有完整的HTML结构，需要重新构建
-            new_soup = BeautifulSoup('<!DOCTYPE html><html><head></head><body></body></html>', 'html.parser')
-            new_soup.body.replace_with(soup)
-            soup = new_soup
+        if not HTML_TAG_RE.search(content):
+            # lxml 已自动补全html/body结构，这里补上文档类型声明
+            soup.insert(0, Doctype('html'))
             modified = True
+            restructured = True
         
         head = soup.find('head')
         if not head:
             head = soup.new_tag('head')
             soup.html.insert(0, head)
             modified = True
+            restructured = True
+        
+        existing = index_seo_tags(soup)
+        new_tags = []
+        
+        def append_to_head(tag):
+            """追加标签到head并记录下来，保存时用于拼接"""
+            head.append(tag)
+            new_tags.append(tag)
+        
+        # 生成的标题和描述会在多处作为后备值，每个文件只计算一次
+        generated = {}
+        
+        def generated_title():
+            """按内容生成的标题（缓存）"""
+            if 'title' not in generated:
+                generated['title'] = generate_title_from_content(soup, file_path)
+            return generated['title']
+        
+        def generated_description():
+            """按内容生成的描述（缓存）"""
+            if 'description' not in generated:
+                generated['description'] = generate_description_from_content(soup, file_path)
+            return generated['description']
+        
+        # canonical、og:url 和 JSON-LD 共用的页面URL
+        page_url = f"https://bespoke-bags.com/{os.path.relpath(file_path, '.').replace(chr(92), '/')}"
         
         # 修复title标签
-        title = soup.find('title')
+        title = existing.get('title')
         if not title or not title.get_text().strip():
             if title:
                 title.decompose()
             title = soup.new_tag('title')
-            title.string = generate_title_from_content(soup, file_path)
+            title.string = generated_title()
             head.insert(0, title)
             modified = True
-            print(f"添加title标签: {file_path}")
+            restructured = True
+            logs.append(f"添加title标签: {file_path}")
         elif len(title.get_text().strip()) < 30:
             # 标题过短，需要扩展
             old_title = title.get_text().strip()
             new_title = old_title + " | Premium Bespoke Bags"
             title.string = new_title
             modified = True
-            print(f"扩展标题: {file_path}")
+            restructured = True
+            logs.append(f"扩展标题: {file_path}")
         
         # 修复meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        meta_desc = existing.get(('name', 'description'))
         if not meta_desc or not meta_desc.get('content', '').strip():
             if meta_desc:
                 meta_desc.decompose()
+                restructured = True
             meta_desc = soup.new_tag('meta')
             meta_desc['name'] = 'description'
-            meta_desc['content'] = generate_description_from_content(soup, file_path)
-            head.append(meta_desc)
+            meta_desc['content'] = generated_description()
+            append_to_head(meta_desc)
             modified = True
-            print(f"添加meta description: {file_path}")
+            logs.append(f"添加meta description: {file_path}")
         elif len(meta_desc.get('content', '').strip()) < 120:
             # 描述过短，需要扩展
             old_desc = meta_desc.get('content', '').strip()
             new_desc = old_desc + " Discover premium bespoke bags crafted with excellence."
             meta_desc['content'] = new_desc[:160]
             modified = True
-            print(f"扩展描述: {file_path}")
+            restructured = True
+            logs.append(f"扩展描述: {file_path}")
         
         # 添加viewport设置
-        viewport = soup.find('meta', attrs={'name': 'viewport'})
+        viewport = existing.get(('name', 'viewport'))
         if not viewport:
             viewport = soup.new_tag('meta')
             viewport['name'] = 'viewport'
             viewport['content'] = 'width=device-width, initial-scale=1.0'
-            head.append(viewport)
+            append_to_head(viewport)
             modified = True
         
         # 添加meta keywords
-        keywords = soup.find('meta', attrs={'name': 'keywords'})
+        keywords = existing.get(('name', 'keywords'))
         if not keywords or not keywords.get('content', '').strip():
             if keywords:
                 keywords.decompose()
+                restructured = True
             keywords = soup.new_tag('meta')
             keywords['name'] = 'keywords'
             keywords['content'] = generate_keywords_from_content(soup, file_path)
-            head.append(keywords)
+            append_to_head(keywords)
             modified = True
         
         # 添加canonical链接
-        canonical = soup.find('link', attrs={'rel': 'canonical'})
+        canonical = existing.get('canonical')
         if not canonical:
             canonical = soup.new_tag('link')
             canonical['rel'] = 'canonical'
             # 从文件路径生成URL
-            relative_path = os.path.relpath(file_path, '.').replace('\\', '/')
-            canonical['href'] = f'https://bespoke-bags.com/{relative_path}'
-            head.append(canonical)
+            canonical['href'] = page_url
+            append_to_head(canonical)
             modified = True
         
         # 添加H1标签（如果缺少）
@@ -152,146 +275,134 @@ def fix_seo_issues(file_path):
             body = soup.find('body')
             if body:
                 h1 = soup.new_tag('h1')
-                title_text = soup.find('title')
-                if title_text:
-                    h1.string = title_text.get_text().replace(' | Bespoke Bags', '').replace(' | Premium Bespoke Bags', '')
+                if title:
+                    h1.string = title.get_text().replace(' | Bespoke Bags', '').replace(' | Premium Bespoke Bags', '')
                 else:
-                    h1.string = generate_title_from_content(soup, file_path).replace(' | Bespoke Bags', '')
+                    h1.string = generated_title().replace(' | Bespoke Bags', '')
                 # 在body的开始处插入H1
                 if body.contents:
                     body.insert(0, h1)
                 else:
                     body.append(h1)
                 modified = True
-                print(f"添加H1标签: {file_path}")
+                restructured = True
+                logs.append(f"添加H1标签: {file_path}")
         
         # 添加Open Graph标签
-        og_title = soup.find('meta', attrs={'property': 'og:title'})
+        og_title = existing.get(('property', 'og:title'))
         if not og_title:
             og_title = soup.new_tag('meta')
             og_title['property'] = 'og:title'
-            title_tag = soup.find('title')
-            og_title['content'] = title_tag.get_text() if title_tag else generate_title_from_content(soup, file_path)
-            head.append(og_title)
+            og_title['content'] = title.get_text() if title else generated_title()
+            append_to_head(og_title)
             modified = True
         
-        og_desc = soup.find('meta', attrs={'property': 'og:description'})
+        og_desc = existing.get(('property', 'og:description'))
         if not og_desc:
             og_desc = soup.new_tag('meta')
             og_desc['property'] = 'og:description'
-            meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
-            og_desc['content'] = meta_desc_tag.get('content') if meta_desc_tag else generate_description_from_content(soup, file_path)
-            head.append(og_desc)
+            og_desc['content'] = meta_desc.get('content') if meta_desc else generated_description()
+            append_to_head(og_desc)
             modified = True
         
-        og_url = soup.find('meta', attrs={'property': 'og:url'})
+        og_url = existing.get(('property', 'og:url'))
         if not og_url:
             og_url = soup.new_tag('meta')
             og_url['property'] = 'og:url'
-            relative_path = os.path.relpath(file_path, '.').replace('\\', '/')
-            og_url['content'] = f'https://bespoke-bags.com/{relative_path}'
-            head.append(og_url)
+            og_url['content'] = page_url
+            append_to_head(og_url)
             modified = True
         
-        og_image = soup.find('meta', attrs={'property': 'og:image'})
+        og_image = existing.get(('property', 'og:image'))
         if not og_image:
             og_image = soup.new_tag('meta')
             og_image['property'] = 'og:image'
             og_image['content'] = 'https://bespoke-bags.com/images/bespoke-bags-og-image.jpg'
-            head.append(og_image)
+            append_to_head(og_image)
             modified = True
         
         # 添加Twitter Card标签
-        twitter_card = soup.find('meta', attrs={'name': 'twitter:card'})
+        twitter_card = existing.get(('name', 'twitter:card'))
         if not twitter_card:
             twitter_card = soup.new_tag('meta')
             twitter_card['name'] = 'twitter:card'
             twitter_card['content'] = 'summary_large_image'
-            head.append(twitter_card)
+            append_to_head(twitter_card)
             modified = True
         
-        twitter_title = soup.find('meta', attrs={'name': 'twitter:title'})
+        twitter_title = existing.get(('name', 'twitter:title'))
         if not twitter_title:
             twitter_title = soup.new_tag('meta')
             twitter_title['name'] = 'twitter:title'
-            title_tag = soup.find('title')
-            twitter_title['content'] = title_tag.get_text() if title_tag else generate_title_from_content(soup, file_path)
-            head.append(twitter_title)
+            twitter_title['content'] = title.get_text() if title else generated_title()
+            append_to_head(twitter_title)
             modified = True
         
-        twitter_desc = soup.find('meta', attrs={'name': 'twitter:description'})
+        twitter_desc = existing.get(('name', 'twitter:description'))
         if not twitter_desc:
             twitter_desc = soup.new_tag('meta')
             twitter_desc['name'] = 'twitter:description'
-            meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
-            twitter_desc['content'] = meta_desc_tag.get('content') if meta_desc_tag else generate_description_from_content(soup, file_path)
-            head.append(twitter_desc)
+            twitter_desc['content'] = meta_desc.get('content') if meta_desc else generated_description()
+            append_to_head(twitter_desc)
             modified = True
         
-        twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
+        twitter_image = existing.get(('name', 'twitter:image'))
         if not twitter_image:
             twitter_image = soup.new_tag('meta')
             twitter_image['name'] = 'twitter:image'
             twitter_image['content'] = 'https://bespoke-bags.com/images/bespoke-bags-twitter-image.jpg'
-            head.append(twitter_image)
+            append_to_head(twitter_image)
             modified = True
         
         # 添加JSON-LD结构化数据
-        json_ld = soup.find('script', attrs={'type': 'application/ld+json'})
+        json_ld = existing.get('json_ld')
         if not json_ld:
             json_ld = soup.new_tag('script')
             json_ld['type'] = 'application/ld+json'
             
-            title_tag = soup.find('title')
-            meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
-            
-            structured_data = {
-                "@context": "https://schema.org",
-                "@type": "WebPage",
-                "name": title_tag.get_text() if title_tag else generate_title_from_content(soup, file_path),
-                "description": meta_desc_tag.get('content') if meta_desc_tag else generate_description_from_content(soup, file_path),
-                "url": f"https://bespoke-bags.com/{os.path.relpath(file_path, '.').replace(chr(92), '/')}",
-                "publisher": {
-                    "@type": "Organization",
-                    "name": "Bespoke Bags",
-                    "url": "https://bespoke-bags.com"
-                }
-            }
-            
-            json_ld.string = json.dumps(structured_data, ensure_ascii=False, indent=2)
-            head.append(json_ld)
+            json_ld.string = JSON_LD_TEMPLATE.format(
+                name=dump_json_string(title.get_text() if title else generated_title()),
+                description=dump_json_string(meta_desc.get('content') if meta_desc else generated_description()),
+                url=dump_json_string(page_url),
+            )
+            append_to_head(json_ld)
             modified = True
         
         # 保存修改后的文件
         if modified:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(str(soup))
+            head_close = HEAD_CLOSE_RE.search(content)
+            if restructured or not head_close:
+                write_text_atomic(file_path, str(soup))
+            else:
+                # 新标签直接拼接到原文的</head>之前，无需重新序列化整个文档
+                insert_at = head_close.start()
+                write_text_atomic(file_path, content[:insert_at] + ''.join(str(tag) for tag in new_tags) + content[insert_at:])
             return True
         
     except Exception as e:
-        print(f"处理文件 {file_path} 时出错: {str(e)}")
+        logs.append(f"处理文件 {file_path} 时出错: {str(e)}")
         return False
+    finally:
+        # 子进程中每个文件的输出合并成一次写入，避免与其他进程交错
+        if logs:
+            sys.stdout.write('\n'.join(logs) + '\n')
     
     return False
 
 def main():
     """主函数"""
     website_dir = '.'
-    fixed_files = 0
-    total_files = 0
     
     print("开始修复 bespoke-bags.com 网站的剩余SEO问题...")
     print("=" * 50)
     
     # 遍历所有HTML文件
-    for root, dirs, files in os.walk(website_dir):
-        for file in files:
-            if file.endswith('.html'):
-                file_path = os.path.join(root, file)
-                total_files += 1
-                
-                if fix_seo_issues(file_path):
-                    fixed_files += 1
+    html_files = list(iter_html_files(website_dir))
+    total_files = len(html_files)
+    
+    # 各文件相互独立，多进程并行修复
+    with ProcessPoolExecutor() as executor:
+        fixed_files = sum(executor.map(fix_seo_issues, html_files, chunksize=32))
     
     print(f"\n修复完成！")
     print(f"总处理文件数: {total_files}")
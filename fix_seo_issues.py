@@ -6,8 +6,213 @@ SEO问题修复脚本 - 批量修复网站SEO问题
 
 import os
 import re
-from bs4 import BeautifulSoup
+import threading
 import json
+from enum import IntEnum
+from html import escape
+from lxml import html
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from file_utils import iter_html_files, write_text_atomic
+
+# orjson 编码更快且默认不转义非ASCII字符，未安装时退回标准库，两者输出一致
+try:
+    import orjson
+    
+    def dump_json_ld(data):
+        """把JSON-LD数据编码为缩进两格的JSON文本"""
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+except ImportError:
+    def dump_json_ld(data):
+        """把JSON-LD数据编码为缩进两格的JSON文本"""
+        return json.dumps(data, ensure_ascii=False, indent=2)
+
+# 新增的head标签拼接到原文的这个位置之前
+HEAD_CLOSE_RE = re.compile(r'</head\s*>', re.IGNORECASE)
+
+# 修复后的页面必然包含这些字符串；全部存在时无需解析
+FIXED_MARKERS = (
+    'rel="canonical"',
+    'property="og:title"', 'property="og:description"', 'property="og:image"',
+    'property="og:url"', 'property="og:type"', 'property="og:site_name"',
+    'name="twitter:card"', 'name="twitter:title"', 'name="twitter:description"',
+    'name="twitter:image"', 'name="twitter:site"',
+    'application/ld+json',
+)
+
+class Fix(IntEnum):
+    """修复类型编号，统计时直接作为计数列表的下标"""
+    CANONICAL = 0
+    OG_TITLE = 1
+    OG_DESCRIPTION = 2
+    OG_IMAGE = 3
+    OG_URL = 4
+    OG_TYPE = 5
+    OG_SITE_NAME = 6
+    TWITTER_CARD = 7
+    TWITTER_TITLE = 8
+    TWITTER_DESCRIPTION = 9
+    TWITTER_IMAGE = 10
+    TWITTER_SITE = 11
+    JSON_LD = 12
+    URL_FORMAT = 13
+
+# 报告中显示的修复类型名称，按 Fix 编号排列
+FIX_NAMES = (
+    '添加canonical链接',
+    '添加og:title', '添加og:description', '添加og:image',
+    '添加og:url', '添加og:type', '添加og:site_name',
+    '添加twitter:card', '添加twitter:title', '添加twitter:description',
+    '添加twitter:image', '添加twitter:site',
+    '添加Schema.org JSON-LD标记',
+    '修复URL格式',
+)
+
+# 每个线程复用同一个lxml解析器，避免每个文件重新创建
+_parser_local = threading.local()
+
+def get_html_parser():
+    """返回当前线程的lxml HTML解析器，首次调用时创建"""
+    parser = getattr(_parser_local, 'parser', None)
+    if parser is None:
+        parser = _parser_local.parser = html.HTMLParser()
+    return parser
+
+def format_tag(tag_name, **attrs):
+    """直接拼出自闭合标签的HTML文本，属性值做转义"""
+    attr_text = ' '.join(f'{name}="{escape(value, quote=True)}"' for name, value in attrs.items())
+    return f'<{tag_name} {attr_text}/>'
+
+def find_first(tree, xpath, value):
+    """返回文档中第一个匹配的元素，没有时返回None；查询值通过XPath变量传入"""
+    matches = tree.xpath(xpath, value=value)
+    return matches[0] if matches else None
+
+def fix_seo_content(content, relative_path):
+    """在内存中为页面补全缺少的SEO标签，返回 (新内容, 修复列表)；未修改时原样返回内容"""
+    # 重复运行时大部分页面已修复过，字符串检查通过就跳过解析
+    if all(marker in content for marker in FIXED_MARKERS):
+        return content, []
+    
+    # 直接用lxml解析和查询，省去BeautifulSoup的Python对象包装
+    tree = html.document_fromstring(content, parser=get_html_parser())
+    fixes_applied = []
+    modified = False
+    
+    # 获取基本信息
+    title_tag = tree.find('.//title')
+    title_text = title_tag.text_content().strip() if title_tag is not None else ''
+    
+    meta_desc = find_first(tree, '//meta[@name=$value]', 'description')
+    desc_text = meta_desc.get('content', '').strip() if meta_desc is not None else ''
+    
+    # 生成页面URL
+    if relative_path == 'index.html':
+        page_url = 'https://bespoke-bags.com/'
+    elif relative_path.startswith('blog/'):
+        page_name = os.path.splitext(os.path.basename(relative_path))[0]
+        page_url = f'https://bespoke-bags.com/blog/{page_name}.html'
+    else:
+        page_name = os.path.splitext(relative_path)[0]
+        page_url = f'https://bespoke-bags.com/{page_name}.html'
+    
+    # 生成图片URL
+    image_url = 'https://bespoke-bags.com/images/bespoke-bags (1).webp'
+    
+    # 获取head标签；新标签直接插入原文的</head>之前，没有</head>时无法插入
+    head = tree.find('head')
+    head_close = HEAD_CLOSE_RE.search(content)
+    if not head_close:
+        head = None
+    new_tags = []
+    
+    # 修复缺少的canonical链接
+    canonical = find_first(tree, '//link[contains(concat(" ", normalize-space(@rel), " "), $value)]', ' canonical ')
+    if canonical is None and head is not None:
+        new_tags.append(format_tag('link', rel='canonical', href=page_url))
+        fixes_applied.append(Fix.CANONICAL)
+        modified = True
+    
+    # 修复缺少的OG标签
+    if head is not None:
+        og_tags = {
+            'og:title': (title_text, Fix.OG_TITLE),
+            'og:description': (desc_text, Fix.OG_DESCRIPTION),
+            'og:image': (image_url, Fix.OG_IMAGE),
+            'og:url': (page_url, Fix.OG_URL),
+            'og:type': ('website', Fix.OG_TYPE),
+            'og:site_name': ('Bespoke Bags', Fix.OG_SITE_NAME)
+        }
+        
+        for property_name, (tag_content, fix) in og_tags.items():
+            existing_tag = find_first(tree, '//meta[@property=$value]', property_name)
+            if existing_tag is None and tag_content:
+                new_tags.append(format_tag('meta', property=property_name, content=tag_content))
+                fixes_applied.append(fix)
+                modified = True
+    
+    # 修复缺少的Twitter卡片
+    if head is not None:
+        twitter_tags = {
+            'twitter:card': ('summary_large_image', Fix.TWITTER_CARD),
+            'twitter:title': (title_text, Fix.TWITTER_TITLE),
+            'twitter:description': (desc_text, Fix.TWITTER_DESCRIPTION),
+            'twitter:image': (image_url, Fix.TWITTER_IMAGE),
+            'twitter:site': ('@bespokebags', Fix.TWITTER_SITE)
+        }
+        
+        for tag_name, (tag_content, fix) in twitter_tags.items():
+            existing_tag = find_first(tree, '//meta[@name=$value]', tag_name)
+            if existing_tag is None and tag_content:
+                new_tags.append(format_tag('meta', name=tag_name, content=tag_content))
+                fixes_applied.append(fix)
+                modified = True
+    
+    # 修复缺少的Schema.org JSON-LD标记
+    json_ld = find_first(tree, '//script[@type=$value]', 'application/ld+json')
+    if json_ld is None and head is not None:
+        schema_data = {
+            "@context": "https://schema.org",
+            "@type": "WebPage",
+            "name": title_text,
+            "description": desc_text,
+            "url": page_url,
+            "image": image_url,
+            "publisher": {
+                "@type": "Organization",
+                "name": "Bespoke Bags",
+                "url": "https://bespoke-bags.com"
+            }
+        }
+        
+        new_tags.append(f'<script type="application/ld+json">{dump_json_ld(schema_data)}</script>')
+        fixes_applied.append(Fix.JSON_LD)
+        modified = True
+    
+    if not modified:
+        return content, fixes_applied
+    
+    # 只在</head>前拼接新增标签，其余内容保持原样，无需重新序列化整个文档
+    insert_at = head_close.start()
+    return content[:insert_at] + ''.join(new_tags) + content[insert_at:], fixes_applied
+
+def fix_seo_file(file_path, root_dir):
+    """修复单个HTML文件的SEO问题，返回 (相对路径, 修复列表, 错误信息)；模块级函数以便在子进程中运行"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        relative_path = os.path.relpath(file_path, root_dir)
+        new_content, fixes_applied = fix_seo_content(content, relative_path)
+        
+        # 保存修改后的文件
+        if fixes_applied:
+            write_text_atomic(file_path, new_content)
+        
+        return relative_path, fixes_applied, None
+        
+    except Exception as e:
+        return None, [], f"修复文件 {file_path} 时出错: {e}"
 
 class SEOFixer:
     def __init__(self, root_dir):
@@ -17,145 +222,42 @@ class SEOFixer:
             'total_files': 0,
             'fixed_files': 0,
             'fixes_applied': 0,
-            'fix_types': {}
+            # 按 Fix 编号计数，累加只需一次列表下标操作
+            'fix_types': [0] * len(Fix)
         }
     
+    def record_file_result(self, relative_path, fixes_applied, error):
+        """汇总单个文件的修复结果"""
+        if error:
+            print(error)
+            return
+        
+        if fixes_applied:
+            self.fixed_files.append({
+                'file': relative_path,
+                'fixes': fixes_applied
+            })
+            self.stats['fixed_files'] += 1
+            self.stats['fixes_applied'] += len(fixes_applied)
+            
+            fix_types = self.stats['fix_types']
+            for fix in fixes_applied:
+                fix_types[fix] += 1
+        
+        self.stats['total_files'] += 1
+    
     def fix_file(self, file_path):
         """修复单个HTML文件的SEO问题"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            soup = BeautifulSoup(content, 'html.parser')
-            relative_path = os.path.relpath(file_path, self.root_dir)
-            fixes_applied = []
-            modified = False
-            
-            # 获取基本信息
-            title_tag = soup.find('title')
-            title_text = title_tag.get_text().strip() if title_tag else ''
-            
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            desc_text = meta_desc.get('content', '').strip() if meta_desc else ''
-            
-            # 生成页面URL
-            if relative_path == 'index.html':
-                page_url = 'https://bespoke-bags.com/'
-            elif relative_path.startswith('blog/'):
-                page_name = os.path.splitext(os.path.basename(relative_path))[0]
-                page_url = f'https://bespoke-bags.com/blog/{page_name}.html'
-            else:
-                page_name = os.path.splitext(relative_path)[0]
-                page_url = f'https://bespoke-bags.com/{page_name}.html'
-            
-            # 生成图片URL
-            image_url = 'https://bespoke-bags.com/images/bespoke-bags (1).webp'
-            
-            # 获取head标签
-            head = soup.find('head')
-            
-            # 修复缺少的canonical链接
-            canonical = soup.find('link', attrs={'rel': 'canonical'})
-            if not canonical and head:
-                canonical_tag = soup.new_tag('link')
-                canonical_tag['rel'] = 'canonical'
-                canonical_tag['href'] = page_url
-                head.append(canonical_tag)
-                fixes_applied.append('添加canonical链接')
-                modified = True
-            
-            # 修复缺少的OG标签
-            if head:
-                og_tags = {
-                    'og:title': title_text,
-                    'og:description': desc_text,
-                    'og:image': image_url,
-                    'og:url': page_url,
-                    'og:type': 'website',
-                    'og:site_name': 'Bespoke Bags'
-                }
-                
-                for property_name, content in og_tags.items():
-                    existing_tag = soup.find('meta', attrs={'property': property_name})
-                    if not existing_tag and content:
-                        og_tag = soup.new_tag('meta')
-                        og_tag['property'] = property_name
-                        og_tag['content'] = content
-                        head.append(og_tag)
-                        fixes_applied.append(f'添加{property_name}')
-                        modified = True
-            
-            # 修复缺少的Twitter卡片
-            if head:
-                twitter_tags = {
-                    'twitter:card': 'summary_large_image',
-                    'twitter:title': title_text,
-                    'twitter:description': desc_text,
-                    'twitter:image': image_url,
-                    'twitter:site': '@bespokebags'
-                }
-                
-                for tag_name, content in twitter_tags.items():
-                    existing_tag = soup.find('meta', attrs={'name': tag_name})
-                    if not existing_tag and content:
-                        twitter_tag = soup.new_tag('meta')
-                        twitter_tag['name'] = tag_name
-                        twitter_tag['content'] = content
-                        head.append(twitter_tag)
-                        fixes_applied.append(f'添加{tag_name}')
-                        modified = True
-            
-            # 修复缺少的Schema.org JSON-LD标记
-            json_ld = soup.find('script', attrs={'type': 'application/ld+json'})
-            if not json_ld and head:
-                schema_data = {
-                    "@context": "https://schema.org",
-                    "@type": "WebPage",
-                    "name": title_text,
-                    "description": desc_text,
-                    "url": page_url,
-                    "image": image_url,
-                    "publisher": {
-                        "@type": "Organization",
-                        "name": "Bespoke Bags",
-                        "url": "https://bespoke-bags.com"
-                    }
-                }
-                
-                script_tag = soup.new_tag('script', type='application/ld+json')
-                script_tag.string = json.dumps(schema_data, ensure_ascii=False, indent=2)
-                head.append(script_tag)
-                fixes_applied.append('添加Schema.org JSON-LD标记')
-                modified = True
-            
-            # 保存修改后的文件
-            if modified:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(str(soup))
-                
-                self.fixed_files.append({
-                    'file': relative_path,
-                    'fixes': fixes_applied
-                })
-                self.stats['fixed_files'] += 1
-                self.stats['fixes_applied'] += len(fixes_applied)
-                
-                for fix in fixes_applied:
-                    fix_type = fix.split('(')[0] if '(' in fix else fix
-                    self.stats['fix_types'][fix_type] = self.stats['fix_types'].get(fix_type, 0) + 1
-            
-            self.stats['total_files'] += 1
-            
-        except Exception as e:
-            print(f"修复文件 {file_path} 时出错: {e}")
+        self.record_file_result(*fix_seo_file(file_path, self.root_dir))
     
     def scan_and_fix_directory(self):
         """扫描并修复目录中的所有HTML文件"""
-        for root, dirs, files in os.walk(self.root_dir):
-            for file in files:
-                if file.endswith('.html'):
-                    file_path = os.path.join(root, file)
-                    self.fix_file(file_path)
+        html_files = list(iter_html_files(self.root_dir))
+        
+        # 各文件相互独立，多进程并行修复，在主进程中按顺序汇总统计
+        with ProcessPoolExecutor(initializer=get_html_parser) as executor:
+            for result in executor.map(fix_seo_file, html_files, repeat(self.root_dir), chunksize=32):
+                self.record_file_result(*result)
     
     def generate_report(self):
         """生成修复报告"""
@@ -165,14 +267,15 @@ class SEOFixer:
         print(f"总修复数: {self.stats['fixes_applied']}")
         
         print("\n=== 修复类型统计 ===")
-        for fix_type, count in sorted(self.stats['fix_types'].items(), key=lambda x: x[1], reverse=True):
+        type_counts = [(FIX_NAMES[fix], count) for fix, count in enumerate(self.stats['fix_types']) if count]
+        for fix_type, count in sorted(type_counts, key=lambda x: x[1], reverse=True):
             print(f"{fix_type}: {count}次")
         
         print("\n=== 修复详情 ===")
         for item in self.fixed_files[:10]:  # 只显示前10个文件的修复
             print(f"\n文件: {item['file']}")
             for fix in item['fixes']:
-                print(f"  - {fix}")
+                print(f"  - {FIX_NAMES[fix]}")
         
         if len(self.fixed_files) > 10:
             print(f"\n... 还有 {len(self.fixed_files) - 10} 个文件被修复")
@@ -6,46 +6,47 @@ SEO URL修复脚本
 将反斜杠替换为正斜杠
 """
 
+import mmap
 import os
 import re
 import glob
 from pathlib import Path
+from file_utils import write_bytes_atomic
+
+# URL修复与SEO检查用到的正则，模块加载时编译一次
+# JSON-LD中的url字段和OG URL标签合并为一个正则，一次扫描找出所有含反斜杠的URL
+# 使用bytes模式，直接在原始文件内容上匹配，无需先解码
+URL_FIX_RE = re.compile(
+    rb'"url":\s*"https://bespoke-bags\.com/[^"]*\\[^"]*",'
+    rb'|<meta content="https://bespoke-bags\.com/[^"]*\\[^"]*" property="og:url"/>'
+)
+URL_TRANSLATE = bytes.maketrans(b'\\', b'/')
+TITLE_RE = re.compile(r'<title>([^<]+)</title>')
+DESCRIPTION_RE = re.compile(r'<meta content="([^"]+)" name="description"/>')
+H1_RE = re.compile(r'<h1[^>]*>([^<]+)</h1>')
+IMG_NO_ALT_RE = re.compile(r'<img(?![^>]*alt=)[^>]*>')
+
+def fix_url_bytes(data):
+    """一次扫描修复JSON-LD和OG URL标签中的URL（匹配部分只有URL里会出现反斜杠），返回 (新内容, 修复处数)"""
+    return URL_FIX_RE.subn(lambda m: m.group(0).translate(URL_TRANSLATE), data)
 
 def fix_html_file(file_path):
     """修复单个HTML文件中的URL格式"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        original_content = content
-        changes_made = False
-        
-        # 修复JSON-LD中的URL
-        json_ld_pattern = r'"url":\s*"(https://bespoke-bags\.com/[^"]*\\[^"]*)",'
-        matches = re.findall(json_ld_pattern, content)
-        
-        for match in matches:
-            fixed_url = match.replace('\\', '/')
-            old_line = f'"url": "{match}",'
-            new_line = f'"url": "{fixed_url}",'
-            content = content.replace(old_line, new_line)
-            changes_made = True
-        
-        # 修复OG URL标签
-        og_url_pattern = r'<meta content="(https://bespoke-bags\.com/[^"]*\\[^"]*)" property="og:url"/>'
-        og_matches = re.findall(og_url_pattern, content)
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # 大部分文件没有需要修复的URL，直接在映射内存上检查，不复制文件内容
+                if not URL_FIX_RE.search(mm):
+                    return False
+                data = bytes(mm)
         
-        for match in og_matches:
-            fixed_url = match.replace('\\', '/')
-            old_tag = f'<meta content="{match}" property="og:url"/>'
-            new_tag = f'<meta content="{fixed_url}" property="og:url"/>'
-            content = content.replace(old_tag, new_tag)
-            changes_made = True
+        data, count = fix_url_bytes(data)
         
         # 如果有更改，写回文件
-        if changes_made:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+        if count:
+            write_bytes_atomic(file_path, data)
             print(f'✓ 修复了 {file_path}')
             return True
         else:
@@ -64,7 +65,7 @@ def check_seo_issues(file_path):
             content = f.read()
         
         # 检查标题长度
-        title_match = re.search(r'<title>([^<]+)</title>', content)
+        title_match = TITLE_RE.search(content)
         if title_match:
             title = title_match.group(1)
             if len(title) > 60:
@@ -75,7 +76,7 @@ def check_seo_issues(file_path):
             issues.append('缺少标题标签')
         
         # 检查描述长度
-        desc_match = re.search(r'<meta content="([^"]+)" name="description"/>', content)
+        desc_match = DESCRIPTION_RE.search(content)
         if desc_match:
             description = desc_match.group(1)
             if len(description) > 160:
@@ -86,14 +87,14 @@ def check_seo_issues(file_path):
             issues.append('缺少描述标签')
         
         # 检查H1标签
-        h1_matches = re.findall(r'<h1[^>]*>([^<]+)</h1>', content)
+        h1_matches = H1_RE.findall(content)
         if not h1_matches:
             issues.append('缺少H1标签')
         elif len(h1_matches) > 1:
             issues.append(f'H1标签过多 ({len(h1_matches)} 个)')
         
         # 检查图片alt属性
-        img_without_alt = re.findall(r'<img(?![^>]*alt=)[^>]*>', content)
+        img_without_alt = IMG_NO_ALT_RE.findall(content)
         if img_without_alt:
             issues.append(f'有 {len(img_without_alt)} 个图片缺少alt属性')
         
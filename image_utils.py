@@ -0,0 +1,62 @@
+"""
+Shared file helpers for the image optimization scripts
+Used by optimize_images.py and auto_optimize_images.py
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+def link_or_copy(src, dst):
+    """Hardlink src to dst, copying when linking isn't possible (e.g. across devices)"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def scan_files(directory):
+    """Recursively yield file paths using os.scandir's cached entry types"""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from scan_files(entry.path)
+            elif entry.is_file():
+                yield entry.path
+
+def replace_file(path, write):
+    """Write to a temp file and swap it in with os.replace.
+    
+    Writing in place would also change the hardlinked copy in images_backup;
+    replacing gives the new content a fresh inode and leaves the backup intact.
+    The temp name comes from mkstemp, so workers writing the same target never share it.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=f".tmp{path.suffix}")
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        write(tmp_path)
+        # mkstemp creates owner-only files; keep the target's permissions so the site can still serve it
+        os.chmod(tmp_path, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+def group_same_stem(image_files, drop_webp):
+    """Group files sharing a directory and stem, in first-seen order.
+    
+    They write the same derived files (foo.jpg and foo.png both produce foo.webp), so each
+    group runs in one worker. With drop_webp, a .webp next to a source is left out: the
+    source's WebP step rewrites it anyway.
+    """
+    groups = {}
+    for image_path in image_files:
+        groups.setdefault(str(image_path.with_suffix('')).lower(), []).append(image_path)
+    
+    grouped = []
+    for paths in groups.values():
+        if drop_webp:
+            paths = [image_path for image_path in paths if image_path.suffix.lower() != '.webp'] or paths
+        grouped.append(paths)
+    return grouped
@@ -2,21 +2,344 @@
 """
 Image Optimization Script for Bespoke Bags Website
 Optimizes images by compressing them and converting to modern formats
+
+Resize speed: pillow-simd is a drop-in replacement for Pillow with vectorized
+LANCZOS resampling; install it instead of Pillow, no code changes are needed.
+JPEG speed: Pillow should be built against libjpeg-turbo; main() warns if it isn't.
+With use_mozjpeg, JPEGs are encoded by mozjpeg's cjpeg (trellis quantization,
+roughly 20% smaller files at about twice the encode time).
+If simplejpeg is installed, other JPEG output goes straight through TurboJPEG.
+JPEGs that need no resize are re-optimized losslessly with jpegtran when it is
+on PATH, and cjxl adds a losslessly recompressed .jxl copy next to each JPEG.
+WebP versions are encoded by libwebp's multi-threaded cwebp when it is on PATH.
 """
 
+import io
 import os
 import sys
-from PIL import Image
+import subprocess
+import PIL
+from PIL import Image, features
 import json
 from pathlib import Path
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import chain, repeat
+from image_utils import group_same_stem, link_or_copy, replace_file, scan_files
+
+try:
+    import numpy as np
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+JPEG_SUFFIXES = ('.jpg', '.jpeg')
+PNG_SUFFIX = '.png'
+RESPONSIVE_SUFFIXES = JPEG_SUFFIXES + (PNG_SUFFIX,)
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# pillow-simd releases carry a ".postN" version suffix
+PILLOW_SIMD = '.post' in PIL.__version__
+
+# mozjpeg's cjpeg is used for JPEG output when use_mozjpeg is set and it is on PATH
+CJPEG = shutil.which('cjpeg')
+
+# jpegtran rewrites Huffman tables and scan order without touching the DCT coefficients
+JPEGTRAN = shutil.which('jpegtran')
+
+# cjxl --lossless_jpeg=1 stores a JPEG bit-exactly in about 20% fewer bytes
+CJXL = shutil.which('cjxl')
+
+# libwebp's cwebp (multi-threaded with -mt) encodes WebP straight from these source formats
+CWEBP = shutil.which('cwebp')
+CWEBP_INPUTS = {'.jpg', '.jpeg', '.png', '.tif', '.tiff'}
+
+def run_tool(*args):
+    """Run an external encoder, raising with its output on failure"""
+    subprocess.run([str(arg) for arg in args], check=True, capture_output=True)
+
+def encode_with_cjpeg(img, quality):
+    """Encode an RGB or grayscale image to progressive JPEG bytes with cjpeg, fed as PNM over stdin"""
+    pnm = io.BytesIO()
+    img.save(pnm, 'PPM')
+    return subprocess.run(
+        [CJPEG, '-quality', str(quality), '-progressive', '-optimize'],
+        input=pnm.getvalue(), check=True, capture_output=True
+    ).stdout
+
+def encode_with_simplejpeg(img, quality):
+    """Encode an RGB or grayscale image with TurboJPEG directly, skipping Pillow's save plugin"""
+    if img.mode == 'L':
+        return simplejpeg.encode_jpeg(np.asarray(img)[..., np.newaxis], quality=quality,
+                                      colorspace='GRAY', fastdct=True)
+    # 4:2:0 subsampling matches Pillow's default for this quality range
+    return simplejpeg.encode_jpeg(np.asarray(img), quality=quality, colorspace='RGB',
+                                  colorsubsampling='420', fastdct=True)
+
+def optimize_decoded_image(img, image_path, quality=85, max_width=1920, max_height=1080, use_mozjpeg=False):
+    """Optimize an already opened image and save it over image_path.
+    
+    Returns (result, img) where img is the flattened/resized image that was saved,
+    so later steps can reuse the decoded pixels.
+    """
+    # Get original file size
+    original_size = image_path.stat().st_size
+    suffix = image_path.suffix.lower()
+    is_jpeg = img.format == 'JPEG' and suffix in JPEG_SUFFIXES
+    oversized = img.width > max_width or img.height > max_height
+    
+    # Let libjpeg decode an oversized JPEG at a reduced DCT scale (1/2, 1/4, 1/8);
+    # draft only picks a scale that still covers the target box, so thumbnail refines from there
+    if oversized and img.format == 'JPEG':
+        img.draft('RGB', (max_width, max_height))
+    
+    # Decode now, before the file on disk is replaced
+    img.load()
+    
+    # Convert RGBA to RGB if saving as JPEG
+    if img.mode in ('RGBA', 'LA', 'P') and suffix in JPEG_SUFFIXES:
+        # Create white background
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        # An RGBA image masks with its own alpha band, so no band needs to be split out
+        background.paste(img, mask=img if img.mode == 'RGBA' else None)
+        img = background
+    
+    # Resize if image is too large (judged on the original size, a draft decode may already fit)
+    resized_to = None
+    if oversized:
+        img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+        resized_to = f"{img.width}x{img.height}"
+    
+    # Optimize and save
+    save_kwargs = {
+        'optimize': True,
+        'quality': quality
+    }
+    
+    # Add format-specific optimizations
+    if suffix in JPEG_SUFFIXES:
+        save_kwargs['progressive'] = True
+    elif suffix == PNG_SUFFIX:
+        save_kwargs['compress_level'] = 9
+    
+    # Save optimized image; a JPEG kept at its size is re-optimized losslessly to avoid generational loss
+    if is_jpeg and resized_to is None and JPEGTRAN:
+        replace_file(image_path, lambda path: run_tool(JPEGTRAN, '-copy', 'none', '-optimize', '-progressive',
+                                                       '-outfile', path, image_path))
+    elif use_mozjpeg and CJPEG and suffix in JPEG_SUFFIXES and img.mode in ('RGB', 'L'):
+        data = encode_with_cjpeg(img, quality)
+        replace_file(image_path, lambda path: path.write_bytes(data))
+    elif simplejpeg and suffix in JPEG_SUFFIXES and img.mode in ('RGB', 'L'):
+        data = encode_with_simplejpeg(img, quality)
+        replace_file(image_path, lambda path: path.write_bytes(data))
+    else:
+        replace_file(image_path, lambda path: img.save(path, **save_kwargs))
+    
+    jxl_path = None
+    if CJXL and suffix in JPEG_SUFFIXES:
+        jxl_path = image_path.with_suffix('.jxl')
+        replace_file(jxl_path, lambda path: run_tool(CJXL, '--lossless_jpeg=1', image_path, path))
+    
+    # Get new file size
+    stat = image_path.stat()
+    new_size = stat.st_size
+    space_saved = original_size - new_size
+    compression_ratio = (space_saved / original_size) * 100 if original_size > 0 else 0
+    
+    return {
+        'success': True,
+        'original_size': original_size,
+        'new_size': new_size,
+        'space_saved': space_saved,
+        'compression_ratio': compression_ratio,
+        'resized_to': resized_to,
+        'jxl_path': jxl_path,
+        'mtime_ns': stat.st_mtime_ns
+    }, img
+
+def optimize_image(image_path, quality=85, max_width=1920, max_height=1080, use_mozjpeg=False):
+    """Optimize a single image"""
+    try:
+        with Image.open(image_path) as img:
+            return optimize_decoded_image(img, image_path, quality, max_width, max_height, use_mozjpeg)[0]
+        
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+def save_webp(img, webp_path, quality=85):
+    """Save an image as WebP, keeping transparency only for RGBA"""
+    # Convert to RGB if necessary
+    if img.mode in ('RGBA', 'LA', 'P'):
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        
+        # For WebP, we can keep transparency
+        if img.mode == 'RGBA':
+            pass  # Keep RGBA for WebP
+        else:
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img if len(img.getbands()) > 3 else None)
+            img = background
+    
+    # Save as WebP
+    replace_file(webp_path, lambda path: img.save(path, 'WebP', quality=quality, optimize=True))
+
+def convert_to_webp(image_path, quality=85, img=None):
+    """Convert image to WebP format for better compression; img reuses an already decoded image"""
+    try:
+        webp_path = image_path.with_suffix('.webp')
+        
+        # Skip if WebP already exists and is newer
+        if webp_path.exists() and webp_path.stat().st_mtime > image_path.stat().st_mtime:
+            return {'success': True, 'skipped': True, 'path': webp_path}
+        
+        # cwebp keeps alpha, so grayscale+alpha images stay on the Pillow path that flattens them
+        if CWEBP and image_path.suffix.lower() in CWEBP_INPUTS and (img is None or img.mode != 'LA'):
+            replace_file(webp_path, lambda path: run_tool(CWEBP, '-quiet', '-q', quality, '-m', '6', '-mt', '-af',
+                                                          image_path, '-o', path))
+        elif img is None:
+            with Image.open(image_path) as img:
+                save_webp(img, webp_path, quality)
+        else:
+            save_webp(img, webp_path, quality)
+        
+        original_size = image_path.stat().st_size
+        webp_size = webp_path.stat().st_size
+        space_saved = original_size - webp_size
+        
+        return {
+            'success': True,
+            'original_size': original_size,
+            'webp_size': webp_size,
+            'space_saved': space_saved,
+            'path': webp_path
+        }
+        
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+def save_responsive_images(img, image_path, sizes):
+    """Save downscaled copies of img for each width in sizes, returning their details"""
+    responsive_images = []
+    original_width = img.width
+    aspect_ratio = img.height / img.width
+    
+    # Generate filename with size suffix
+    base_name = image_path.stem.split('.')[0]
+    extension = image_path.suffix
+    suffix = extension.lower()
+    
+    # Save responsive image
+    save_kwargs = {'optimize': True, 'quality': 85}
+    if suffix in JPEG_SUFFIXES:
+        save_kwargs['progressive'] = True
+    elif suffix == PNG_SUFFIX:
+        save_kwargs['compress_level'] = 9
+    
+    # Largest first, each size downscaled from the previous one so every resize runs on fewer pixels
+    source = img
+    for size in sorted(sizes, reverse=True):
+        if size >= original_width:
+            continue  # Skip if size is larger than original
+        
+        # Calculate new height from the original aspect ratio so rounding doesn't drift down the chain
+        new_height = max(int(size * aspect_ratio), 1)
+        
+        # resize returns a new image, so the source needs no defensive copy
+        resized_img = source.resize((size, new_height), Image.Resampling.LANCZOS)
+        source = resized_img
+        
+        responsive_path = image_path.parent / f"{base_name}_{size}w{extension}"
+        
+        if simplejpeg and suffix in JPEG_SUFFIXES and resized_img.mode in ('RGB', 'L'):
+            data = encode_with_simplejpeg(resized_img, 85)
+            replace_file(responsive_path, lambda path: path.write_bytes(data))
+        else:
+            replace_file(responsive_path, lambda path: resized_img.save(path, **save_kwargs))
+        responsive_images.append({
+            'size': size,
+            'path': responsive_path,
+            'dimensions': f"{resized_img.width}x{resized_img.height}"
+        })
+    
+    # Report sizes smallest first
+    responsive_images.reverse()
+    return responsive_images
+
+def generate_responsive_images(image_path, sizes=[480, 768, 1024, 1920], img=None):
+    """Generate responsive image sizes; img reuses an already decoded image"""
+    try:
+        if img is None:
+            with Image.open(image_path) as img:
+                responsive_images = save_responsive_images(img, image_path, sizes)
+        else:
+            responsive_images = save_responsive_images(img, image_path, sizes)
+        
+        return {
+            'success': True,
+            'responsive_images': responsive_images
+        }
+        
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+def create_derived_images(image_path, create_webp=True, create_responsive=True, img=None):
+    """Create the WebP and responsive versions, returning their result dicts (None for skipped steps)"""
+    suffix = image_path.suffix.lower()
+    webp_result = None
+    if create_webp and suffix != '.webp':
+        webp_result = convert_to_webp(image_path, img=img)
+    
+    responsive_result = None
+    if create_responsive and suffix in RESPONSIVE_SUFFIXES:
+        responsive_result = generate_responsive_images(image_path, img=img)
+    
+    return webp_result, responsive_result
+
+def process_image_file(image_path, create_webp=True, create_responsive=True, use_mozjpeg=False):
+    """Run the requested optimizations on one image; module-level so it can run in a worker process.
+    
+    The image is decoded once and the optimized pixels feed the WebP and responsive outputs.
+    Returns the original size and each step's result dict (None for skipped steps)
+    for ImageOptimizer.optimize_all_images to report in the parent process.
+    """
+    original_size = image_path.stat().st_size
+    
+    try:
+        with Image.open(image_path) as img:
+            opt_result, img = optimize_decoded_image(img, image_path, use_mozjpeg=use_mozjpeg)
+            webp_result, responsive_result = create_derived_images(image_path, create_webp, create_responsive, img)
+    except Exception as e:
+        # Nothing usable was decoded; the later steps reopen the file themselves
+        opt_result = {'success': False, 'error': str(e)}
+        webp_result, responsive_result = create_derived_images(image_path, create_webp, create_responsive)
+    
+    return original_size, opt_result, webp_result, responsive_result
+
+def process_image_group(image_paths, create_webp=True, create_responsive=True, use_mozjpeg=False):
+    """Process same-stem images one after another in a single worker"""
+    return [process_image_file(image_path, create_webp, create_responsive, use_mozjpeg) for image_path in image_paths]
 
 class ImageOptimizer:
     def __init__(self, base_dir):
         self.base_dir = Path(base_dir)
         self.images_dir = self.base_dir / 'images'
         self.backup_dir = self.base_dir / 'images_backup'
+        self.report_path = self.base_dir / 'image_optimization_report.json'
+        # Skip state lives in its own file: auto_optimize_images.py writes the report path too
+        self.cache_path = self.base_dir / '.optimize_cache.json'
         self.supported_formats = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'}
         self.optimization_report = {
             'timestamp': datetime.now().isoformat(),
@@ -25,7 +348,8 @@ class ImageOptimizer:
             'total_size_before': 0,
             'total_size_after': 0,
             'space_saved': 0,
-            'files': []
+            'files': [],
+            'files_skipped': []
         }
     
     def create_backup(self):
@@ -35,293 +359,230 @@ class ImageOptimizer:
             return
         
         print(f"Creating backup of images to: {self.backup_dir}")
-        shutil.copytree(self.images_dir, self.backup_dir)
+        # Hardlink instead of copying: every output is written via replace_file,
+        # so the linked originals stay untouched
+        shutil.copytree(self.images_dir, self.backup_dir, copy_function=link_or_copy)
         print("Backup created successfully!")
     
     def get_image_files(self):
         """Get all image files in the images directory"""
         image_files = []
         
-        for root, dirs, files in os.walk(self.images_dir):
-            for file in files:
-                file_path = Path(root) / file
-                if file_path.suffix.lower() in self.supported_formats:
-                    image_files.append(file_path)
+        for path in scan_files(self.images_dir):
+            name = os.path.basename(path)
+            dot = name.rfind('.')
+            if dot > 0 and name[dot:].lower() in self.supported_formats:
+                image_files.append(Path(path))
         
         return image_files
     
-    def optimize_image(self, image_path, quality=85, max_width=1920, max_height=1080):
-        """Optimize a single image"""
+    def load_previous_results(self):
+        """Load the file entries this script recorded on its last run, indexed by path"""
         try:
-            # Get original file size
-            original_size = image_path.stat().st_size
-            
-            # Open image
-            with Image.open(image_path) as img:
-                # Convert RGBA to RGB if saving as JPEG
-                if img.mode in ('RGBA', 'LA', 'P') and image_path.suffix.lower() in ['.jpg', '.jpeg']:
-                    # Create white background
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                    img = background
-                
-                # Resize if image is too large
-                if img.width > max_width or img.height > max_height:
-                    img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-                    print(f"  Resized to: {img.width}x{img.height}")
-                
-                # Optimize and save
-                save_kwargs = {
-                    'optimize': True,
-                    'quality': quality
-                }
-                
-                # Add format-specific optimizations
-                if image_path.suffix.lower() in ['.jpg', '.jpeg']:
-                    save_kwargs['progressive'] = True
-                elif image_path.suffix.lower() == '.png':
-                    save_kwargs['compress_level'] = 9
-                
-                # Save optimized image
-                img.save(image_path, **save_kwargs)
-            
-            # Get new file size
-            new_size = image_path.stat().st_size
-            space_saved = original_size - new_size
-            compression_ratio = (space_saved / original_size) * 100 if original_size > 0 else 0
-            
-            return {
-                'success': True,
-                'original_size': original_size,
-                'new_size': new_size,
-                'space_saved': space_saved,
-                'compression_ratio': compression_ratio
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        
+        if not isinstance(previous, dict):
+            return {}
+        return {path: info for path, info in previous.items()
+                if isinstance(info, dict) and 'options' in info and 'outputs' in info}
+    
+    def save_cache(self):
+        """Record every fully processed or skipped file so the next run can skip it"""
+        entries = self.optimization_report['files'] + self.optimization_report['files_skipped']
+        cache = {info['path']: info for info in entries if 'mtime_ns' in info}
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+    
+    def is_unchanged(self, image_path, previous, options):
+        """Check whether a file was optimized with the same options and is untouched since, with all outputs present"""
+        info = previous.get(str(image_path.relative_to(self.base_dir)))
+        if info is None or info['options'] != options:
+            return False
+        
+        stat = image_path.stat()
+        if (stat.st_size, stat.st_mtime_ns) != (info['new_size'], info['mtime_ns']):
+            return False
+        
+        if not all((self.base_dir / output).exists() for output in info['outputs']):
+            return False
+        
+        self.optimization_report['files_skipped'].append(info)
+        return True
+    
+    def optimize_image(self, image_path, quality=85, max_width=1920, max_height=1080, use_mozjpeg=False):
+        """Optimize a single image"""
+        return optimize_image(image_path, quality, max_width, max_height, use_mozjpeg)
     
     def convert_to_webp(self, image_path, quality=85):
         """Convert image to WebP format for better compression"""
-        try:
-            webp_path = image_path.with_suffix('.webp')
-            
-            # Skip if WebP already exists and is newer
-            if webp_path.exists() and webp_path.stat().st_mtime > image_path.stat().st_mtime:
-                return {'success': True, 'skipped': True, 'path': webp_path}
-            
-            with Image.open(image_path) as img:
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    
-                    # For WebP, we can keep transparency
-                    if img.mode == 'RGBA':
-                        pass  # Keep RGBA for WebP
-                    else:
-                        background = Image.new('RGB', img.size, (255, 255, 255))
-                        background.paste(img, mask=img.split()[-1] if len(img.split()) > 3 else None)
-                        img = background
-                
-                # Save as WebP
-                img.save(webp_path, 'WebP', quality=quality, optimize=True)
-            
-            original_size = image_path.stat().st_size
-            webp_size = webp_path.stat().st_size
-            space_saved = original_size - webp_size
-            
-            return {
-                'success': True,
-                'original_size': original_size,
-                'webp_size': webp_size,
-                'space_saved': space_saved,
-                'path': webp_path
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        return convert_to_webp(image_path, quality)
     
     def generate_responsive_images(self, image_path, sizes=[480, 768, 1024, 1920]):
         """Generate responsive image sizes"""
-        try:
-            responsive_images = []
-            
-            with Image.open(image_path) as img:
-                original_width = img.width
-                
-                for size in sizes:
-                    if size >= original_width:
-                        continue  # Skip if size is larger than original
-                    
-                    # Calculate new height maintaining aspect ratio
-                    aspect_ratio = img.height / img.width
-                    new_height = int(size * aspect_ratio)
-                    
-                    # Create resized image
-                    resized_img = img.copy()
-                    resized_img.thumbnail((size, new_height), Image.Resampling.LANCZOS)
-                    
-                    # Generate filename with size suffix
-                    name_parts = image_path.stem.split('.')
-                    base_name = name_parts[0]
-                    extension = image_path.suffix
-                    
-                    responsive_path = image_path.parent / f"{base_name}_{size}w{extension}"
-                    
-                    # Save responsive image
-                    save_kwargs = {'optimize': True, 'quality': 85}
-                    if extension.lower() in ['.jpg', '.jpeg']:
-                        save_kwargs['progressive'] = True
-                    elif extension.lower() == '.png':
-                        save_kwargs['compress_level'] = 9
-                    
-                    resized_img.save(responsive_path, **save_kwargs)
-                    responsive_images.append({
-                        'size': size,
-                        'path': responsive_path,
-                        'dimensions': f"{resized_img.width}x{resized_img.height}"
-                    })
-            
-            return {
-                'success': True,
-                'responsive_images': responsive_images
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        return generate_responsive_images(image_path, sizes)
     
-    def optimize_all_images(self, create_webp=True, create_responsive=True):
+    def optimize_all_images(self, create_webp=True, create_responsive=True, use_mozjpeg=False):
         """Optimize all images in the images directory"""
         print("Starting image optimization...")
         
         # Create backup first
         self.create_backup()
         
-        # Get all image files
-        image_files = self.get_image_files()
+        # Get all image files, leaving out WebP and responsive copies written by earlier runs
+        previous = self.load_previous_results()
+        generated = {output for info in previous.values() for output in info['outputs']}
+        image_files = [image_path for image_path in self.get_image_files()
+                       if str(image_path.relative_to(self.base_dir)) not in generated]
         self.optimization_report['total_files'] = len(image_files)
         
         print(f"Found {len(image_files)} image files to optimize")
         
-        for i, image_path in enumerate(image_files, 1):
-            print(f"\n[{i}/{len(image_files)}] Processing: {image_path.name}")
+        # Skip files left untouched since the previous run; re-encoding them would only lose quality
+        options = {'create_webp': create_webp, 'create_responsive': create_responsive, 'use_mozjpeg': use_mozjpeg}
+        image_files = [image_path for image_path in image_files if not self.is_unchanged(image_path, previous, options)]
+        if self.optimization_report['files_skipped']:
+            print(f"Skipping {len(self.optimization_report['files_skipped'])} files unchanged since the last run")
+        
+        # Same-stem files share their WebP output, so each such group stays in one task
+        groups = group_same_stem(image_files, drop_webp=create_webp)
+        pending = sum(len(paths) for paths in groups)
+        if pending < len(image_files):
+            print(f"Leaving {len(image_files) - pending} WebP files to the WebP step of their same-stem sources")
+        image_files = list(chain.from_iterable(groups))
+        
+        # Groups are independent, so process them across all cores and report results in order
+        with ProcessPoolExecutor() as executor:
+            results = chain.from_iterable(executor.map(process_image_group, groups, repeat(create_webp),
+                                                       repeat(create_responsive), repeat(use_mozjpeg), chunksize=4))
+            for i, (image_path, result) in enumerate(zip(image_files, results), 1):
+                self.record_file_result(i, len(image_files), image_path, options, *result)
+        
+        # Save optimization report
+        self.save_report()
+        self.save_cache()
+        
+        # Print summary
+        self.print_summary()
+    
+    def record_file_result(self, i, total, image_path, options, original_size, opt_result, webp_result, responsive_result):
+        """Print one image's results and merge them into the optimization report"""
+        print(f"\n[{i}/{total}] Processing: {image_path.name}")
+        
+        file_report = {
+            'filename': image_path.name,
+            'path': str(image_path.relative_to(self.base_dir)),
+            'original_size': original_size,
+            'optimizations': []
+        }
+        # Files written alongside the original; all must exist for the next run to skip this file
+        outputs = []
+        complete = opt_result['success']
+        
+        # Original optimization
+        print("  Optimizing original image...")
+        if opt_result.get('resized_to'):
+            print(f"  Resized to: {opt_result['resized_to']}")
+        
+        if opt_result['success']:
+            file_report['optimizations'].append({
+                'type': 'compression',
+                'original_size': opt_result['original_size'],
+                'new_size': opt_result['new_size'],
+                'space_saved': opt_result['space_saved'],
+                'compression_ratio': opt_result['compression_ratio']
+            })
             
-            file_report = {
-                'filename': image_path.name,
-                'path': str(image_path.relative_to(self.base_dir)),
-                'original_size': image_path.stat().st_size,
-                'optimizations': []
-            }
+            self.optimization_report['total_size_before'] += opt_result['original_size']
+            self.optimization_report['total_size_after'] += opt_result['new_size']
+            self.optimization_report['space_saved'] += opt_result['space_saved']
             
-            # Original optimization
-            print("  Optimizing original image...")
-            opt_result = self.optimize_image(image_path)
+            print(f"    Compressed: {self.format_size(opt_result['space_saved'])} saved ({opt_result['compression_ratio']:.1f}%)")
             
-            if opt_result['success']:
+            if opt_result['jxl_path']:
+                outputs.append(str(opt_result['jxl_path'].relative_to(self.base_dir)))
+                print("    JPEG XL copy created")
+        else:
+            print(f"    Error: {opt_result['error']}")
+            file_report['optimizations'].append({
+                'type': 'compression',
+                'error': opt_result['error']
+            })
+        
+        # Create WebP version
+        if webp_result is not None:
+            print("  Creating WebP version...")
+            if webp_result['success']:
+                outputs.append(str(webp_result['path'].relative_to(self.base_dir)))
+                if webp_result.get('skipped'):
+                    print("    WebP version already exists and is up to date")
+                else:
+                    file_report['optimizations'].append({
+                        'type': 'webp_conversion',
+                        'original_size': webp_result['original_size'],
+                        'webp_size': webp_result['webp_size'],
+                        'space_saved': webp_result['space_saved'],
+                        'webp_path': str(webp_result['path'].relative_to(self.base_dir))
+                    })
+                    print(f"    WebP created: {self.format_size(webp_result['space_saved'])} saved")
+            else:
+                complete = False
+                print(f"    WebP error: {webp_result['error']}")
                 file_report['optimizations'].append({
-                    'type': 'compression',
-                    'original_size': opt_result['original_size'],
-                    'new_size': opt_result['new_size'],
-                    'space_saved': opt_result['space_saved'],
-                    'compression_ratio': opt_result['compression_ratio']
+                    'type': 'webp_conversion',
+                    'error': webp_result['error']
                 })
-                
-                self.optimization_report['total_size_before'] += opt_result['original_size']
-                self.optimization_report['total_size_after'] += opt_result['new_size']
-                self.optimization_report['space_saved'] += opt_result['space_saved']
-                
-                print(f"    Compressed: {self.format_size(opt_result['space_saved'])} saved ({opt_result['compression_ratio']:.1f}%)")
+        
+        # Create responsive images
+        if responsive_result is not None:
+            print("  Creating responsive sizes...")
+            if responsive_result['success']:
+                responsive_images = [
+                    dict(responsive, path=str(responsive['path'].relative_to(self.base_dir)))
+                    for responsive in responsive_result['responsive_images']
+                ]
+                outputs.extend(responsive['path'] for responsive in responsive_images)
+                file_report['optimizations'].append({
+                    'type': 'responsive_images',
+                    'responsive_images': responsive_images
+                })
+                print(f"    Created {len(responsive_result['responsive_images'])} responsive sizes")
             else:
-                print(f"    Error: {opt_result['error']}")
+                complete = False
+                print(f"    Responsive error: {responsive_result['error']}")
                 file_report['optimizations'].append({
-                    'type': 'compression',
-                    'error': opt_result['error']
+                    'type': 'responsive_images',
+                    'error': responsive_result['error']
                 })
-            
-            # Create WebP version
-            if create_webp and image_path.suffix.lower() != '.webp':
-                print("  Creating WebP version...")
-                webp_result = self.convert_to_webp(image_path)
-                
-                if webp_result['success']:
-                    if webp_result.get('skipped'):
-                        print("    WebP version already exists and is up to date")
-                    else:
-                        file_report['optimizations'].append({
-                            'type': 'webp_conversion',
-                            'original_size': webp_result['original_size'],
-                            'webp_size': webp_result['webp_size'],
-                            'space_saved': webp_result['space_saved'],
-                            'webp_path': str(webp_result['path'].relative_to(self.base_dir))
-                        })
-                        print(f"    WebP created: {self.format_size(webp_result['space_saved'])} saved")
-                else:
-                    print(f"    WebP error: {webp_result['error']}")
-                    file_report['optimizations'].append({
-                        'type': 'webp_conversion',
-                        'error': webp_result['error']
-                    })
-            
-            # Create responsive images
-            if create_responsive and image_path.suffix.lower() in ['.jpg', '.jpeg', '.png']:
-                print("  Creating responsive sizes...")
-                responsive_result = self.generate_responsive_images(image_path)
-                
-                if responsive_result['success']:
-                    file_report['optimizations'].append({
-                        'type': 'responsive_images',
-                        'responsive_images': responsive_result['responsive_images']
-                    })
-                    print(f"    Created {len(responsive_result['responsive_images'])} responsive sizes")
-                else:
-                    print(f"    Responsive error: {responsive_result['error']}")
-                    file_report['optimizations'].append({
-                        'type': 'responsive_images',
-                        'error': responsive_result['error']
-                    })
-            
-            self.optimization_report['files'].append(file_report)
-            self.optimization_report['optimized_files'] += 1
         
-        # Save optimization report
-        self.save_report()
+        # Record the state the file was left in so an unchanged file can be skipped next run
+        if complete:
+            file_report['new_size'] = opt_result['new_size']
+            file_report['mtime_ns'] = opt_result['mtime_ns']
+            file_report['options'] = options
+            file_report['outputs'] = outputs
         
-        # Print summary
-        self.print_summary()
+        self.optimization_report['files'].append(file_report)
+        self.optimization_report['optimized_files'] += 1
     
     def format_size(self, size_bytes):
         """Format file size in human readable format"""
         if size_bytes == 0:
             return "0 B"
         
-        size_names = ["B", "KB", "MB", "GB"]
-        i = 0
-        while size_bytes >= 1024 and i < len(size_names) - 1:
-            size_bytes /= 1024
-            i += 1
-        
-        return f"{size_bytes:.1f} {size_names[i]}"
+        # Each unit is 2**10 of the previous, so the bit length picks it without a loop;
+        # negative sizes (an output larger than its source) scale by their magnitude
+        i = min((abs(int(size_bytes)).bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+        return f"{size_bytes / (1 << (10 * i)):.1f} {SIZE_UNITS[i]}"
     
     def save_report(self):
         """Save optimization report to JSON file"""
-        report_path = self.base_dir / 'image_optimization_report.json'
-        
-        with open(report_path, 'w', encoding='utf-8') as f:
+        with open(self.report_path, 'w', encoding='utf-8') as f:
             json.dump(self.optimization_report, f, indent=2, ensure_ascii=False)
         
-        print(f"\nOptimization report saved to: {report_path}")
+        print(f"\nOptimization report saved to: {self.report_path}")
     
     def print_summary(self):
         """Print optimization summary"""
@@ -359,6 +620,8 @@ class ImageOptimizer:
   <source media="(max-width: 1024px)" 
           srcset="images/product_1024w.webp" 
           type="image/webp">
+  <source srcset="images/product.jxl" 
+          type="image/jxl">
   <source srcset="images/product.webp" 
           type="image/webp">
   
@@ -417,7 +680,13 @@ def main():
     script_dir = Path(__file__).parent
     
     print("Bespoke Bags Image Optimizer")
-    print("============================\n")
+    print("============================")
+    if PILLOW_SIMD:
+        print(f"Using Pillow-SIMD {PIL.__version__}\n")
+    else:
+        print(f"Using Pillow {PIL.__version__} (install pillow-simd for faster resizing)\n")
+    if not features.check_feature('libjpeg_turbo'):
+        print("Warning: Pillow is not built against libjpeg-turbo; JPEG encoding will be slower\n")
     
     # Check if images directory exists
     images_dir = script_dir / 'images'
@@ -441,6 +710,7 @@ def main():
         
         create_webp = True
         create_responsive = True
+        use_mozjpeg = False
         
         if choice == "2":
             create_webp = False
@@ -450,11 +720,14 @@ def main():
         elif choice == "4":
             create_webp = input("Create WebP versions? (y/n) [y]: ").strip().lower() != 'n'
             create_responsive = input("Create responsive sizes? (y/n) [y]: ").strip().lower() != 'n'
+            if CJPEG:
+                use_mozjpeg = input("Encode JPEGs with mozjpeg cjpeg? (y/n) [n]: ").strip().lower() == 'y'
         
         # Run optimization
         optimizer.optimize_all_images(
             create_webp=create_webp,
-            create_responsive=create_responsive
+            create_responsive=create_responsive,
+            use_mozjpeg=use_mozjpeg
         )
         
         # Create guide
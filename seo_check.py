@@ -6,13 +6,212 @@ SEO检查脚本 - 分析网站SEO问题
 
 import os
 import re
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from urllib.parse import urljoin, urlparse
 import json
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from file_utils import collect_site_paths, iter_html_files
+
+# 逐文件写出的问题明细（JSON Lines，每行一个文件）和最后写出的统计摘要
+REPORT_PATH = 'seo_report.jsonl'
+SUMMARY_PATH = 'seo_summary.json'
+
+# 报告中展示详细问题的文件数，只有这些条目留在内存里
+PREVIEW_FILES = 20
+
+# orjson 编码更快且默认不转义非ASCII字符，未安装时退回标准库，两者输出一致
+try:
+    import orjson
+    
+    def dump_json_line(data):
+        """把一条记录编码为单行JSON字节串，末尾带换行"""
+        return orjson.dumps(data) + b'\n'
+    
+    def dump_json_summary(data):
+        """把统计摘要编码为缩进两格的JSON字节串"""
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def dump_json_line(data):
+        """把一条记录编码为单行JSON字节串，末尾带换行"""
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+    
+    def dump_json_summary(data):
+        """把统计摘要编码为缩进两格的JSON字节串"""
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+# 检查用到的全部标签；正文段落、布局容器等不参与检查
+CHECK_TAGS = ['title', 'meta', 'link', 'script', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'img', 'a']
+
+# 只为上述标签建树，省去整页DOM的分配
+CHECK_STRAINER = SoupStrainer(CHECK_TAGS)
+
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+def link_target_exists(target_path, root_dir, site_paths):
+    """等价于 os.path.exists(target_path) or os.path.exists(target_path + '.html')，站内路径只查集合"""
+    rel_path = os.path.relpath(target_path, root_dir)
+    if rel_path == os.pardir or rel_path.startswith(os.pardir + os.sep):
+        # 站外路径不在集合里，仍直接查询文件系统
+        return os.path.exists(target_path) or os.path.exists(target_path + '.html')
+    
+    site_files, site_dirs = site_paths
+    if target_path.endswith(os.sep):
+        # 末尾带斜杠只能是目录
+        return rel_path in site_dirs
+    return rel_path in site_files or rel_path in site_dirs or rel_path + '.html' in site_files
+
+def check_seo_file(file_path, root_dir, site_paths):
+    """检查单个HTML文件的SEO问题，返回 (相对路径, 问题列表, 错误信息)；模块级函数以便在子进程中运行"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        soup = BeautifulSoup(content, 'lxml', parse_only=CHECK_STRAINER)
+        relative_path = os.path.relpath(file_path, root_dir)
+        file_issues = []
+        
+        # 一次遍历收集所有检查用到的标签；title、canonical、JSON-LD和同名meta取第一个，与find一致
+        title = canonical = json_ld = None
+        meta_by_name = {}
+        meta_by_property = {}
+        headings = []
+        images = []
+        links = []
+        for tag in soup.find_all(CHECK_TAGS):
+            tag_name = tag.name
+            if tag_name == 'meta':
+                name = tag.get('name')
+                if name is not None:
+                    meta_by_name.setdefault(name, tag)
+                prop = tag.get('property')
+                if prop is not None:
+                    meta_by_property.setdefault(prop, tag)
+            elif tag_name in HEADING_TAGS:
+                headings.append(tag)
+            elif tag_name == 'img':
+                images.append(tag)
+            elif tag_name == 'a':
+                if tag.get('href') is not None:
+                    links.append(tag)
+            elif tag_name == 'title':
+                if title is None:
+                    title = tag
+            elif tag_name == 'link':
+                if canonical is None and 'canonical' in tag.get('rel', ()):
+                    canonical = tag
+            elif tag_name == 'script':
+                if json_ld is None and tag.get('type') == 'application/ld+json':
+                    json_ld = tag
+        
+        # 检查标题
+        if not title:
+            file_issues.append('缺少title标签')
+        elif len(title.get_text().strip()) == 0:
+            file_issues.append('title标签为空')
+        elif len(title.get_text().strip()) > 60:
+            file_issues.append(f'title过长({len(title.get_text().strip())}字符)')
+        elif len(title.get_text().strip()) < 30:
+            file_issues.append(f'title过短({len(title.get_text().strip())}字符)')
+        
+        # 检查meta description
+        meta_desc = meta_by_name.get('description')
+        if not meta_desc:
+            file_issues.append('缺少meta description')
+        elif not meta_desc.get('content') or len(meta_desc.get('content', '').strip()) == 0:
+            file_issues.append('meta description为空')
+        elif len(meta_desc.get('content', '').strip()) > 160:
+            file_issues.append(f'meta description过长({len(meta_desc.get("content", "").strip())}字符)')
+        elif len(meta_desc.get('content', '').strip()) < 120:
+            file_issues.append(f'meta description过短({len(meta_desc.get("content", "").strip())}字符)')
+        
+        # 检查H1标签
+        h1_tags = [heading for heading in headings if heading.name == 'h1']
+        if len(h1_tags) == 0:
+            file_issues.append('缺少H1标签')
+        elif len(h1_tags) > 1:
+            file_issues.append(f'H1标签过多({len(h1_tags)}个)')
+        
+        # 检查标题层级
+        prev_level = 0
+        for heading in headings:
+            level = int(heading.name[1])
+            if level > prev_level + 1:
+                file_issues.append(f'标题层级跳跃: {heading.name}跳过了h{prev_level + 1}')
+            prev_level = level
+        
+        # 检查图片alt属性
+        for img in images:
+            if not img.get('alt'):
+                file_issues.append('图片缺少alt属性')
+            elif len(img.get('alt', '').strip()) == 0:
+                file_issues.append('图片alt属性为空')
+        
+        # 检查内部链接
+        for link in links:
+            href = link.get('href')
+            if href.startswith('/') or href.startswith('./'):
+                # 检查内部链接是否存在
+                if href.startswith('/'):
+                    target_path = os.path.join(root_dir, href.lstrip('/'))
+                else:
+                    target_path = os.path.join(os.path.dirname(file_path), href)
+                
+                if not link_target_exists(target_path, root_dir, site_paths):
+                    file_issues.append(f'内部链接404: {href}')
+        
+        # 检查canonical链接
+        if not canonical:
+            file_issues.append('缺少canonical链接')
+        elif not canonical.get('href'):
+            file_issues.append('canonical链接为空')
+        
+        # 检查OG标签
+        og_title = meta_by_property.get('og:title')
+        og_desc = meta_by_property.get('og:description')
+        og_image = meta_by_property.get('og:image')
+        og_url = meta_by_property.get('og:url')
+        
+        if not og_title:
+            file_issues.append('缺少og:title')
+        if not og_desc:
+            file_issues.append('缺少og:description')
+        if not og_image:
+            file_issues.append('缺少og:image')
+        if not og_url:
+            file_issues.append('缺少og:url')
+        
+        # 检查Twitter卡片
+        twitter_card = meta_by_name.get('twitter:card')
+        twitter_title = meta_by_name.get('twitter:title')
+        twitter_desc = meta_by_name.get('twitter:description')
+        twitter_image = meta_by_name.get('twitter:image')
+        
+        if not twitter_card:
+            file_issues.append('缺少twitter:card')
+        if not twitter_title:
+            file_issues.append('缺少twitter:title')
+        if not twitter_desc:
+            file_issues.append('缺少twitter:description')
+        if not twitter_image:
+            file_issues.append('缺少twitter:image')
+        
+        # 检查Schema.org标记
+        if not json_ld:
+            file_issues.append('缺少Schema.org JSON-LD标记')
+        
+        return relative_path, file_issues, None
+        
+    except Exception as e:
+        return None, [], f"检查文件 {file_path} 时出错: {e}"
 
 class SEOChecker:
-    def __init__(self, root_dir):
+    def __init__(self, root_dir, report_file=None):
         self.root_dir = root_dir
+        # 以二进制模式打开的明细文件；每个文件的问题检查完立即写出，不在内存中累积
+        self.report_file = report_file
+        # 站点文件列表只读，各子进程共用同一份
+        self.site_paths = collect_site_paths(root_dir)
         self.issues = []
         self.stats = {
             'total_files': 0,
@@ -21,142 +220,43 @@ class SEOChecker:
             'issue_types': {}
         }
     
+    def record_file_result(self, relative_path, file_issues, error):
+        """汇总单个文件的检查结果"""
+        if error:
+            print(error)
+            return
+        
+        if file_issues:
+            item = {
+                'file': relative_path,
+                'issues': file_issues
+            }
+            if self.report_file is not None:
+                self.report_file.write(dump_json_line(item))
+            if len(self.issues) < PREVIEW_FILES:
+                self.issues.append(item)
+            self.stats['files_with_issues'] += 1
+            self.stats['total_issues'] += len(file_issues)
+            
+            for issue in file_issues:
+                issue_type = issue.split(':')[0] if ':' in issue else issue
+                self.stats['issue_types'][issue_type] = self.stats['issue_types'].get(issue_type, 0) + 1
+        
+        self.stats['total_files'] += 1
+    
     def check_file(self, file_path):
         """检查单个HTML文件的SEO问题"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            soup = BeautifulSoup(content, 'html.parser')
-            relative_path = os.path.relpath(file_path, self.root_dir)
-            file_issues = []
-            
-            # 检查标题
-            title = soup.find('title')
-            if not title:
-                file_issues.append('缺少title标签')
-            elif len(title.get_text().strip()) == 0:
-                file_issues.append('title标签为空')
-            elif len(title.get_text().strip()) > 60:
-                file_issues.append(f'title过长({len(title.get_text().strip())}字符)')
-            elif len(title.get_text().strip()) < 30:
-                file_issues.append(f'title过短({len(title.get_text().strip())}字符)')
-            
-            # 检查meta description
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            if not meta_desc:
-                file_issues.append('缺少meta description')
-            elif not meta_desc.get('content') or len(meta_desc.get('content', '').strip()) == 0:
-                file_issues.append('meta description为空')
-            elif len(meta_desc.get('content', '').strip()) > 160:
-                file_issues.append(f'meta description过长({len(meta_desc.get("content", "").strip())}字符)')
-            elif len(meta_desc.get('content', '').strip()) < 120:
-                file_issues.append(f'meta description过短({len(meta_desc.get("content", "").strip())}字符)')
-            
-            # 检查H1标签
-            h1_tags = soup.find_all('h1')
-            if len(h1_tags) == 0:
-                file_issues.append('缺少H1标签')
-            elif len(h1_tags) > 1:
-                file_issues.append(f'H1标签过多({len(h1_tags)}个)')
-            
-            # 检查标题层级
-            headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-            prev_level = 0
-            for heading in headings:
-                level = int(heading.name[1])
-                if level > prev_level + 1:
-                    file_issues.append(f'标题层级跳跃: {heading.name}跳过了h{prev_level + 1}')
-                prev_level = level
-            
-            # 检查图片alt属性
-            images = soup.find_all('img')
-            for img in images:
-                if not img.get('alt'):
-                    file_issues.append('图片缺少alt属性')
-                elif len(img.get('alt', '').strip()) == 0:
-                    file_issues.append('图片alt属性为空')
-            
-            # 检查内部链接
-            links = soup.find_all('a', href=True)
-            for link in links:
-                href = link.get('href')
-                if href.startswith('/') or href.startswith('./'):
-                    # 检查内部链接是否存在
-                    if href.startswith('/'):
-                        target_path = os.path.join(self.root_dir, href.lstrip('/'))
-                    else:
-                        target_path = os.path.join(os.path.dirname(file_path), href)
-                    
-                    if not os.path.exists(target_path) and not os.path.exists(target_path + '.html'):
-                        file_issues.append(f'内部链接404: {href}')
-            
-            # 检查canonical链接
-            canonical = soup.find('link', attrs={'rel': 'canonical'})
-            if not canonical:
-                file_issues.append('缺少canonical链接')
-            elif not canonical.get('href'):
-                file_issues.append('canonical链接为空')
-            
-            # 检查OG标签
-            og_title = soup.find('meta', attrs={'property': 'og:title'})
-            og_desc = soup.find('meta', attrs={'property': 'og:description'})
-            og_image = soup.find('meta', attrs={'property': 'og:image'})
-            og_url = soup.find('meta', attrs={'property': 'og:url'})
-            
-            if not og_title:
-                file_issues.append('缺少og:title')
-            if not og_desc:
-                file_issues.append('缺少og:description')
-            if not og_image:
-                file_issues.append('缺少og:image')
-            if not og_url:
-                file_issues.append('缺少og:url')
-            
-            # 检查Twitter卡片
-            twitter_card = soup.find('meta', attrs={'name': 'twitter:card'})
-            twitter_title = soup.find('meta', attrs={'name': 'twitter:title'})
-            twitter_desc = soup.find('meta', attrs={'name': 'twitter:description'})
-            twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
-            
-            if not twitter_card:
-                file_issues.append('缺少twitter:card')
-            if not twitter_title:
-                file_issues.append('缺少twitter:title')
-            if not twitter_desc:
-                file_issues.append('缺少twitter:description')
-            if not twitter_image:
-                file_issues.append('缺少twitter:image')
-            
-            # 检查Schema.org标记
-            json_ld = soup.find('script', attrs={'type': 'application/ld+json'})
-            if not json_ld:
-                file_issues.append('缺少Schema.org JSON-LD标记')
-            
-            if file_issues:
-                self.issues.append({
-                    'file': relative_path,
-                    'issues': file_issues
-                })
-                self.stats['files_with_issues'] += 1
-                self.stats['total_issues'] += len(file_issues)
-                
-                for issue in file_issues:
-                    issue_type = issue.split(':')[0] if ':' in issue else issue
-                    self.stats['issue_types'][issue_type] = self.stats['issue_types'].get(issue_type, 0) + 1
-            
-            self.stats['total_files'] += 1
-            
-        except Exception as e:
-            print(f"检查文件 {file_path} 时出错: {e}")
+        self.record_file_result(*check_seo_file(file_path, self.root_dir, self.site_paths))
     
     def scan_directory(self):
         """扫描目录中的所有HTML文件"""
-        for root, dirs, files in os.walk(self.root_dir):
-            for file in files:
-                if file.endswith('.html'):
-                    file_path = os.path.join(root, file)
-                    self.check_file(file_path)
+        html_files = list(iter_html_files(self.root_dir))
+        
+        # 各文件相互独立，多进程并行检查，在主进程中按顺序汇总统计
+        with ProcessPoolExecutor() as executor:
+            for result in executor.map(check_seo_file, html_files, repeat(self.root_dir),
+                                       repeat(self.site_paths), chunksize=8):
+                self.record_file_result(*result)
     
     def generate_report(self):
         """生成SEO检查报告"""
@@ -174,30 +274,29 @@ class SEOChecker:
             print(f"{issue_type}: {count}个")
         
         print("\n=== 详细问题列表 ===")
-        for item in self.issues[:20]:  # 只显示前20个文件的问题
+        for item in self.issues:  # 只保留并显示前20个文件的问题
             print(f"\n文件: {item['file']}")
             for issue in item['issues']:
                 print(f"  - {issue}")
         
-        if len(self.issues) > 20:
-            print(f"\n... 还有 {len(self.issues) - 20} 个文件存在问题")
+        if self.stats['files_with_issues'] > PREVIEW_FILES:
+            print(f"\n... 还有 {self.stats['files_with_issues'] - PREVIEW_FILES} 个文件存在问题")
 
 def main():
     root_dir = os.getcwd()
-    checker = SEOChecker(root_dir)
     
     print("开始SEO检查...")
-    checker.scan_directory()
+    # 详细问题边检查边写入，内存占用与站点规模无关
+    with open(REPORT_PATH, 'wb') as report_file:
+        checker = SEOChecker(root_dir, report_file)
+        checker.scan_directory()
     checker.generate_report()
     
-    # 保存详细报告到文件
-    with open('seo_report.json', 'w', encoding='utf-8') as f:
-        json.dump({
-            'stats': checker.stats,
-            'issues': checker.issues
-        }, f, ensure_ascii=False, indent=2)
+    # 保存统计摘要到文件
+    with open(SUMMARY_PATH, 'wb') as f:
+        f.write(dump_json_summary(checker.stats))
     
-    print("\n详细报告已保存到 seo_report.json")
+    print(f"\n详细报告已保存到 {REPORT_PATH}，统计摘要已保存到 {SUMMARY_PATH}")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
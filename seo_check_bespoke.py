@@ -5,125 +5,188 @@ SEO检查脚本 - bespoke-bags.com
 检查网站的SEO优化情况
 """
 
+import hashlib
 import os
 import re
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import json
-from collections import defaultdict
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from file_utils import iter_html_files
+import seo_checks
+from seo_checks import collect_seo_tags, probe_seo_tags
 
-def check_seo_issues(file_path):
-    """检查单个HTML文件的SEO问题"""
+# 其余检查已在原始字节上探测，解析时只需为这些标签建树
+HEAD_STRAINER = SoupStrainer(['title', 'meta'])
+
+# title和meta只在<head>里找，解析到</head>为止；H1在正文中，直接在原始字节上计数
+HEAD_END_RE = re.compile(rb'</head\s*>', re.IGNORECASE)
+H1_RE = re.compile(rb'<h1[\s>/]', re.IGNORECASE)
+
+# 检查结果缓存：{'version': 检查逻辑哈希, 'files': {路径: [mtime_ns, 文件大小, 问题列表]}}，重复运行时未改动的文件直接复用
+CACHE_PATH = '.seo_cache.json'
+
+def checks_version():
+    """检查逻辑所在源文件的哈希，脚本改动后旧缓存里的结果不再可信"""
+    digest = hashlib.sha1()
+    for module_file in (__file__, seo_checks.__file__):
+        with open(module_file, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def load_cache(version):
+    """读取上次运行的检查缓存，文件不存在、已损坏或检查逻辑已改动时返回空字典"""
+    try:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('version') != version:
+        return {}
+    return cache.get('files', {})
+
+def save_cache(cache, version):
+    """保存本次的检查缓存，只包含当前仍存在的文件"""
+    with open(CACHE_PATH, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'files': cache}, f, ensure_ascii=False)
+
+def check_parsed_page(raw, soup):
+    """在已读入的原始字节和已解析的文档上检查SEO问题；soup 至少要包含<head>里的title和meta"""
     issues = []
     
+    # 只需判断是否存在的标签直接在原始字节上用预编译正则探测
+    present = probe_seo_tags(raw)
+    
+    # 一次遍历收集title和meta，后面只查字典
+    found = collect_seo_tags(soup)
+    meta = found['meta']
+    
+    # 检查基本SEO元素（文本只提取一次）
+    title = found['title']
+    title_text = (title.get_text() if title else '').strip()
+    if not title_text:
+        issues.append('缺少title标签')
+    elif len(title_text) > 60:
+        issues.append('标题过长')
+    elif len(title_text) < 30:
+        issues.append('标题过短')
+    
+    # 检查meta description
+    meta_desc = meta.get('description')
+    desc_text = (meta_desc.get('content', '') if meta_desc else '').strip()
+    if not desc_text:
+        issues.append('缺少meta description')
+    elif len(desc_text) > 160:
+        issues.append('描述过长')
+    elif len(desc_text) < 120:
+        issues.append('描述过短')
+    
+    # 检查H1标签
+    h1_count = len(H1_RE.findall(raw))
+    if not h1_count:
+        issues.append('缺少H1标签')
+    elif h1_count > 1:
+        issues.append('H1标签过多')
+    
+    # 检查canonical链接
+    if 'canonical' not in present:
+        issues.append('缺少canonical链接')
+    
+    # 检查viewport设置
+    if 'viewport' not in present:
+        issues.append('缺少viewport设置')
+    
+    # 检查meta keywords
+    keywords = meta.get('keywords')
+    if not keywords or not keywords.get('content', '').strip():
+        issues.append('缺少meta keywords')
+    
+    # 检查Open Graph标签
+    if 'og:title' not in present:
+        issues.append('缺少og:title')
+    if 'og:description' not in present:
+        issues.append('缺少og:description')
+    if 'og:url' not in present:
+        issues.append('缺少og:url')
+    if 'og:image' not in present:
+        issues.append('缺少og:image')
+    
+    # 检查Twitter Card标签
+    if 'twitter:card' not in present:
+        issues.append('缺少Twitter卡片')
+    if 'twitter:title' not in present:
+        issues.append('缺少Twitter标题')
+    if 'twitter:description' not in present:
+        issues.append('缺少Twitter描述')
+    if 'twitter:image' not in present:
+        issues.append('缺少Twitter图片')
+    
+    # 检查JSON-LD结构化数据
+    if 'json_ld' not in present:
+        issues.append('缺少JSON-LD结构化数据')
+    
+    return issues
+
+def check_seo_issues(file_path):
+    """检查单个HTML文件的SEO问题"""
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # 检查基本SEO元素
-        title = soup.find('title')
-        if not title or not title.get_text().strip():
-            issues.append('缺少title标签')
-        elif len(title.get_text().strip()) > 60:
-            issues.append('标题过长')
-        elif len(title.get_text().strip()) < 30:
-            issues.append('标题过短')
-        
-        # 检查meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if not meta_desc or not meta_desc.get('content', '').strip():
-            issues.append('缺少meta description')
-        elif len(meta_desc.get('content', '').strip()) > 160:
-            issues.append('描述过长')
-        elif len(meta_desc.get('content', '').strip()) < 120:
-            issues.append('描述过短')
-        
-        # 检查H1标签
-        h1_tags = soup.find_all('h1')
-        if not h1_tags:
-            issues.append('缺少H1标签')
-        elif len(h1_tags) > 1:
-            issues.append('H1标签过多')
-        
-        # 检查canonical链接
-        canonical = soup.find('link', attrs={'rel': 'canonical'})
-        if not canonical:
-            issues.append('缺少canonical链接')
-        
-        # 检查viewport设置
-        viewport = soup.find('meta', attrs={'name': 'viewport'})
-        if not viewport:
-            issues.append('缺少viewport设置')
-        
-        # 检查meta keywords
-        keywords = soup.find('meta', attrs={'name': 'keywords'})
-        if not keywords or not keywords.get('content', '').strip():
-            issues.append('缺少meta keywords')
-        
-        # 检查Open Graph标签
-        og_title = soup.find('meta', attrs={'property': 'og:title'})
-        og_desc = soup.find('meta', attrs={'property': 'og:description'})
-        og_url = soup.find('meta', attrs={'property': 'og:url'})
-        og_image = soup.find('meta', attrs={'property': 'og:image'})
-        
-        if not og_title:
-            issues.append('缺少og:title')
-        if not og_desc:
-            issues.append('缺少og:description')
-        if not og_url:
-            issues.append('缺少og:url')
-        if not og_image:
-            issues.append('缺少og:image')
+        with open(file_path, 'rb') as f:
+            raw = f.read()
         
-        # 检查Twitter Card标签
-        twitter_card = soup.find('meta', attrs={'name': 'twitter:card'})
-        twitter_title = soup.find('meta', attrs={'name': 'twitter:title'})
-        twitter_desc = soup.find('meta', attrs={'name': 'twitter:description'})
-        twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
-        
-        if not twitter_card:
-            issues.append('缺少Twitter卡片')
-        if not twitter_title:
-            issues.append('缺少Twitter标题')
-        if not twitter_desc:
-            issues.append('缺少Twitter描述')
-        if not twitter_image:
-            issues.append('缺少Twitter图片')
-        
-        # 检查JSON-LD结构化数据
-        json_ld = soup.find('script', attrs={'type': 'application/ld+json'})
-        if not json_ld:
-            issues.append('缺少JSON-LD结构化数据')
+        # title和meta只在<head>里找，只解析这一段
+        head_end = HEAD_END_RE.search(raw)
+        head = raw[:head_end.end()] if head_end else raw
+        soup = BeautifulSoup(head.decode('utf-8', errors='ignore'), 'lxml', parse_only=HEAD_STRAINER)
+        return check_parsed_page(raw, soup)
         
     except Exception as e:
-        issues.append(f'文件读取错误: {str(e)}')
-    
-    return issues
+        return [f'文件读取错误: {str(e)}']
 
 def main():
     """主函数"""
     website_dir = '.'
     total_files = 0
     files_with_issues = 0
-    issue_counts = defaultdict(int)
+    issue_counts = Counter()
     
     print("开始检查 bespoke-bags.com 网站的SEO问题...")
     print("=" * 50)
     
     # 遍历所有HTML文件
-    for root, dirs, files in os.walk(website_dir):
-        for file in files:
-            if file.endswith('.html'):
-                file_path = os.path.join(root, file)
-                total_files += 1
-                
-                issues = check_seo_issues(file_path)
-                
-                if issues:
-                    files_with_issues += 1
-                    for issue in issues:
-                        issue_counts[issue] += 1
+    html_files = list(iter_html_files(website_dir))
+    
+    # mtime和大小都与缓存一致的文件沿用上次的结果，只检查新增或改动过的文件
+    version = checks_version()
+    previous = load_cache(version)
+    cache = {}
+    pending = []
+    for file_path in html_files:
+        stat = os.stat(file_path)
+        key = [stat.st_mtime_ns, stat.st_size]
+        entry = previous.get(file_path)
+        if entry is not None and entry[:2] == key:
+            cache[file_path] = entry
+        else:
+            cache[file_path] = key
+            pending.append(file_path)
+    
+    if len(pending) < len(html_files):
+        print(f"跳过 {len(html_files) - len(pending)} 个自上次检查后未改动的文件")
+    
+    # 多进程并行检查，在主进程中汇总统计
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for file_path, issues in zip(pending, executor.map(check_seo_issues, pending, chunksize=16)):
+            cache[file_path].append(issues)
+    
+    save_cache(cache, version)
+    
+    for file_path in html_files:
+        issues = cache[file_path][2]
+        total_files += 1
+        
+        if issues:
+            files_with_issues += 1
+            issue_counts.update(issues)
     
     # 输出统计结果
     print(f"\n检查完成！")
@@ -135,7 +198,7 @@ def main():
     if issue_counts:
         print("\n主要SEO问题统计:")
         print("-" * 30)
-        for issue, count in sorted(issue_counts.items(), key=lambda x: x[1], reverse=True):
+        for issue, count in issue_counts.most_common():
             print(f"{issue}: {count}次")
     else:
         print("\n🎉 恭喜！所有文件的SEO都已优化完成！")
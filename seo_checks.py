@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+SEO检查公共模块
+final_seo_check.py 与 find_problem_files_bespoke.py 共用的探测、解析与检查逻辑
+"""
+
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+import json
+
+# orjson 的 C 解析器更快，未安装时退回标准库（其 JSONDecodeError 是 json.JSONDecodeError 的子类）
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# 单次遍历需要收集的标签
+SEO_TAGS = ['title', 'meta', 'h1', 'img', 'script']
+
+# 只解析上述标签，跳过正文段落等无关内容
+SEO_STRAINER = SoupStrainer(SEO_TAGS)
+
+# 只需判断是否存在的标签，直接在原始字节上用正则探测，无需解析
+_PROBES = {
+    key: re.compile(pattern) for key, pattern in {
+        'canonical': rb'<link\s[^>]*?rel=["\'](?:[^"\'>]*\s)?canonical[\s"\']',
+        'viewport': rb'<meta\s[^>]*?name=["\']viewport["\']',
+        'og:title': rb'<meta\s[^>]*?property=["\']og:title["\']',
+        'og:description': rb'<meta\s[^>]*?property=["\']og:description["\']',
+        'og:image': rb'<meta\s[^>]*?property=["\']og:image["\']',
+        'og:url': rb'<meta\s[^>]*?property=["\']og:url["\']',
+        'twitter:card': rb'<meta\s[^>]*?name=["\']twitter:card["\']',
+        'twitter:title': rb'<meta\s[^>]*?name=["\']twitter:title["\']',
+        'twitter:description': rb'<meta\s[^>]*?name=["\']twitter:description["\']',
+        'twitter:image': rb'<meta\s[^>]*?name=["\']twitter:image["\']',
+        'json_ld': rb'<script\s[^>]*?type=["\']application/ld\+json["\']',
+    }.items()
+}
+
+def probe_seo_tags(raw):
+    """在原始字节上探测标签是否存在，返回存在的标签集合"""
+    return {key for key, probe in _PROBES.items() if probe.search(raw)}
+
+def collect_seo_tags(soup):
+    """遍历文档一次，收集SEO检查所需的标签（同名标签只保留第一个）"""
+    found = {'title': None, 'json_ld': None, 'meta': {}, 'h1_count': 0, 'missing_alt': 0}
+    meta = found['meta']
+    for tag in soup.find_all(SEO_TAGS):
+        name = tag.name
+        if name == 'meta':
+            # name 和 property 都作为键，与 find(attrs=...) 的匹配方式一致
+            for key in (tag.get('name'), tag.get('property')):
+                if key and key not in meta:
+                    meta[key] = tag
+        elif name == 'img':
+            if not tag.get('alt'):
+                found['missing_alt'] += 1
+        elif name == 'h1':
+            found['h1_count'] += 1
+        elif name == 'title':
+            if found['title'] is None:
+                found['title'] = tag
+        elif name == 'script':
+            if found['json_ld'] is None and tag.get('type') == 'application/ld+json':
+                found['json_ld'] = tag
+    return found
+
+def load_seo_data(file_path, errors='strict'):
+    """读取文件并返回 (字节探测到的标签集合, 解析收集的标签)"""
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    present = probe_seo_tags(raw)
+    soup = BeautifulSoup(raw.decode('utf-8', errors=errors), 'lxml', parse_only=SEO_STRAINER)
+    return present, collect_seo_tags(soup)
+
+# 问题描述常量：每个文件都可能出现的固定描述只在模块加载时创建一次
+MISSING_TITLE = "缺少title标签"
+MISSING_DESCRIPTION = "缺少meta description"
+MISSING_H1 = "缺少H1标签"
+MISSING_JSON_LD = "缺少JSON-LD结构化数据"
+INVALID_JSON_LD = "JSON-LD格式错误"
+
+# 只需判断是否存在的检查项，按报告顺序排列
+PRESENCE_CHECKS = (
+    ('canonical', "缺少canonical链接"),
+    ('og:title', "缺少og:title"),
+    ('og:description', "缺少og:description"),
+    ('og:image', "缺少og:image"),
+    ('og:url', "缺少og:url"),
+    ('twitter:card', "缺少Twitter卡片"),
+    ('twitter:title', "缺少Twitter标题"),
+    ('twitter:description', "缺少Twitter描述"),
+    ('twitter:image', "缺少Twitter图片"),
+)
+
+def check(file_path):
+    """检查单个HTML文件的SEO问题"""
+    issues = []
+    add = issues.append
+    
+    try:
+        present, found = load_seo_data(file_path)
+        
+        # 检查标题（只在长度不合规时才格式化描述）
+        title = found['title']
+        if not title:
+            add(MISSING_TITLE)
+        else:
+            length = len(title.get_text())
+            if length > 60:
+                add(f"标题过长({length}字符)")
+            elif length < 30:
+                add(f"标题过短({length}字符)")
+            
+        # 检查描述
+        description = found['meta'].get('description')
+        if not description:
+            add(MISSING_DESCRIPTION)
+        else:
+            length = len(description.get('content', ''))
+            if length > 160:
+                add(f"描述过长({length}字符)")
+            elif length < 120:
+                add(f"描述过短({length}字符)")
+            
+        # 检查H1标签
+        h1_count = found['h1_count']
+        if not h1_count:
+            add(MISSING_H1)
+        elif h1_count > 1:
+            add(f"H1标签过多({h1_count}个)")
+            
+        # 检查图片alt属性
+        missing_alt = found['missing_alt']
+        if missing_alt > 0:
+            add(f"{missing_alt}个图片缺少alt属性")
+            
+        # 检查canonical链接、OG标签和Twitter卡片
+        for key, issue in PRESENCE_CHECKS:
+            if key not in present:
+                add(issue)
+            
+        # 检查结构化数据
+        json_ld = found['json_ld']
+        if not json_ld:
+            add(MISSING_JSON_LD)
+        else:
+            try:
+                json_loads(json_ld.get_text())
+            except json.JSONDecodeError:
+                add(INVALID_JSON_LD)
+                
+    except Exception as e:
+        add(f"文件读取错误: {str(e)}")
+        
+    return issues
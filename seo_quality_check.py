@@ -7,100 +7,123 @@ SEO质量检查脚本
 
 import os
 import re
-from bs4 import BeautifulSoup
+import sys
+from bs4 import BeautifulSoup, SoupStrainer
 import json
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from file_utils import collect_site_paths
+from seo_checks import collect_seo_tags, probe_seo_tags
 
-def check_seo_elements(file_path):
-    """检查单个HTML文件的SEO元素"""
+# 检查用到的全部标签，只为它们建树
+SEO_STRAINER = SoupStrainer(['title', 'meta', 'script', 'h1', 'img', 'a'])
+
+def link_exists(link_path, site_paths):
+    """等价于 os.path.exists(link_path)；相对当前目录的站内路径只查集合"""
+    if os.path.isabs(link_path) or link_path == os.pardir or link_path.startswith(os.pardir + os.sep):
+        return os.path.exists(link_path)
+    
+    site_files, site_dirs = site_paths
+    return link_path in site_files or link_path in site_dirs
+
+def check_parsed_page(file_path, raw, soup, site_paths=None):
+    """在已读入的原始字节和已解析的文档上检查SEO元素；file_path 用于解析相对链接"""
     issues = []
     
+    # 只需判断是否存在的标签直接在原始字节上用预编译正则探测
+    present = probe_seo_tags(raw)
+    
+    # 一次遍历收集title、meta、JSON-LD、H1和缺少alt的图片，后面只查字典
+    found = collect_seo_tags(soup)
+    meta = found['meta']
+    
+    # 检查基本SEO元素（文本只提取一次，缺失时按空串处理）
+    title = found['title']
+    title_text = (title.get_text() if title else '').strip()
+    if len(title_text) < 10:
+        issues.append("标题缺失或过短")
+    elif len(title_text) > 60:
+        issues.append("标题过长（>60字符）")
+    
+    # 检查meta描述
+    meta_desc = meta.get('description')
+    desc_text = (meta_desc.get('content', '') if meta_desc else '').strip()
+    if len(desc_text) < 120:
+        issues.append("Meta描述缺失或过短")
+    elif len(desc_text) > 160:
+        issues.append("Meta描述过长（>160字符）")
+    
+    # 检查关键词
+    meta_keywords = meta.get('keywords')
+    if not meta_keywords:
+        issues.append("Meta关键词缺失")
+    
+    # 检查canonical链接
+    if 'canonical' not in present:
+        issues.append("Canonical链接缺失")
+    
+    # 检查Open Graph标签
+    if 'og:title' not in present:
+        issues.append("OG标题缺失")
+    if 'og:description' not in present:
+        issues.append("OG描述缺失")
+    if 'og:image' not in present:
+        issues.append("OG图片缺失")
+    
+    # 检查Twitter卡片
+    if 'twitter:card' not in present:
+        issues.append("Twitter卡片缺失")
+    
+    # 检查结构化数据
+    structured_data = found['json_ld']
+    if not structured_data:
+        issues.append("结构化数据缺失")
+    else:
+        try:
+            json.loads(structured_data.get_text())
+        except json.JSONDecodeError:
+            issues.append("结构化数据格式错误")
+    
+    # 检查H1标签
+    h1_count = found['h1_count']
+    if h1_count == 0:
+        issues.append("H1标签缺失")
+    elif h1_count > 1:
+        issues.append("多个H1标签")
+    
+    # 检查图片alt属性
+    missing_alt = found['missing_alt']
+    if missing_alt:
+        issues.append(f"{missing_alt}张图片缺少alt属性")
+    
+    # 检查内部链接
+    internal_links = soup.find_all('a', href=True)
+    broken_links = []
+    for link in internal_links:
+        href = link.get('href')
+        if href.startswith('../') or href.startswith('./'):
+            # 检查相对链接是否存在
+            link_path = os.path.normpath(os.path.join(os.path.dirname(file_path), href))
+            if not (link_exists(link_path, site_paths) if site_paths else os.path.exists(link_path)):
+                broken_links.append(href)
+    
+    if broken_links:
+        issues.append(f"发现{len(broken_links)}个损坏的内部链接")
+    
+    return issues
+
+def check_seo_elements(file_path, site_paths=None):
+    """检查单个HTML文件的SEO元素；site_paths 为 collect_site_paths 的结果，省略时直接查询文件系统"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            soup = BeautifulSoup(content, 'html.parser')
-        
-        # 检查基本SEO元素
-        title = soup.find('title')
-        if not title or len(title.get_text().strip()) < 10:
-            issues.append("标题缺失或过短")
-        elif len(title.get_text().strip()) > 60:
-            issues.append("标题过长（>60字符）")
-        
-        # 检查meta描述
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if not meta_desc or len(meta_desc.get('content', '').strip()) < 120:
-            issues.append("Meta描述缺失或过短")
-        elif len(meta_desc.get('content', '').strip()) > 160:
-            issues.append("Meta描述过长（>160字符）")
-        
-        # 检查关键词
-        meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-        if not meta_keywords:
-            issues.append("Meta关键词缺失")
-        
-        # 检查canonical链接
-        canonical = soup.find('link', attrs={'rel': 'canonical'})
-        if not canonical:
-            issues.append("Canonical链接缺失")
-        
-        # 检查Open Graph标签
-        og_title = soup.find('meta', attrs={'property': 'og:title'})
-        og_desc = soup.find('meta', attrs={'property': 'og:description'})
-        og_image = soup.find('meta', attrs={'property': 'og:image'})
-        
-        if not og_title:
-            issues.append("OG标题缺失")
-        if not og_desc:
-            issues.append("OG描述缺失")
-        if not og_image:
-            issues.append("OG图片缺失")
-        
-        # 检查Twitter卡片
-        twitter_card = soup.find('meta', attrs={'name': 'twitter:card'})
-        if not twitter_card:
-            issues.append("Twitter卡片缺失")
-        
-        # 检查结构化数据
-        structured_data = soup.find('script', attrs={'type': 'application/ld+json'})
-        if not structured_data:
-            issues.append("结构化数据缺失")
-        else:
-            try:
-                json.loads(structured_data.get_text())
-            except json.JSONDecodeError:
-                issues.append("结构化数据格式错误")
+        with open(file_path, 'rb') as f:
+            raw = f.read()
         
-        # 检查H1标签
-        h1_tags = soup.find_all('h1')
-        if len(h1_tags) == 0:
-            issues.append("H1标签缺失")
-        elif len(h1_tags) > 1:
-            issues.append("多个H1标签")
-        
-        # 检查图片alt属性
-        images = soup.find_all('img')
-        images_without_alt = [img for img in images if not img.get('alt')]
-        if images_without_alt:
-            issues.append(f"{len(images_without_alt)}张图片缺少alt属性")
-        
-        # 检查内部链接
-        internal_links = soup.find_all('a', href=True)
-        broken_links = []
-        for link in internal_links:
-            href = link.get('href')
-            if href.startswith('../') or href.startswith('./'):
-                # 检查相对链接是否存在
-                link_path = os.path.normpath(os.path.join(os.path.dirname(file_path), href))
-                if not os.path.exists(link_path):
-                    broken_links.append(href)
-        
-        if broken_links:
-            issues.append(f"发现{len(broken_links)}个损坏的内部链接")
+        soup = BeautifulSoup(raw.decode('utf-8'), 'lxml', parse_only=SEO_STRAINER)
+        return check_parsed_page(file_path, raw, soup, site_paths)
         
     except Exception as e:
-        issues.append(f"文件读取错误: {str(e)}")
-    
-    return issues
+        return [f"文件读取错误: {str(e)}"]
 
 def main():
     """主函数"""
@@ -112,22 +135,30 @@ def main():
     print("开始SEO质量检查...\n")
     
     # 检查博客目录下的所有HTML文件
-    for filename in os.listdir(blog_dir):
-        if filename.endswith('.html') and filename != 'index.html':
-            file_path = os.path.join(blog_dir, filename)
+    filenames = [filename for filename in os.listdir(blog_dir)
+                 if filename.endswith('.html') and filename != 'index.html']
+    file_paths = [os.path.join(blog_dir, filename) for filename in filenames]
+    
+    # 内部链接只查这份路径集合，各子进程共用
+    site_paths = collect_site_paths(os.curdir)
+    
+    # 多进程并行检查，结果按文件顺序返回
+    # 逐文件的输出先收集起来，最后一次写出，避免每行都单独刷新输出
+    out = []
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        file_results = executor.map(check_seo_elements, file_paths, repeat(site_paths), chunksize=16)
+        for filename, issues in zip(filenames, file_results):
             total_files += 1
             
-            issues = check_seo_elements(file_path)
-            
             if issues:
                 files_with_issues += 1
                 results[filename] = issues
-                print(f"❌ {filename}:")
-                for issue in issues:
-                    print(f"   - {issue}")
-                print()
+                out.append(f"❌ {filename}:\n")
+                out.extend(f"   - {issue}\n" for issue in issues)
+                out.append("\n")
             else:
-                print(f"✅ {filename}: 所有SEO元素正常")
+                out.append(f"✅ {filename}: 所有SEO元素正常\n")
+    sys.stdout.write(''.join(out))
     
     # 输出总结
     print(f"\n=== SEO检查总结 ===")
@@ -137,15 +168,9 @@ def main():
     
     if results:
         print(f"\n需要修复的问题:")
-        all_issues = []
-        for issues in results.values():
-            all_issues.extend(issues)
-        
-        issue_counts = {}
-        for issue in all_issues:
-            issue_counts[issue] = issue_counts.get(issue, 0) + 1
+        issue_counts = Counter(chain.from_iterable(results.values()))
         
-        for issue, count in sorted(issue_counts.items(), key=lambda x: x[1], reverse=True):
+        for issue, count in issue_counts.most_common():
             print(f"  - {issue}: {count}次")
     
     return len(results) == 0
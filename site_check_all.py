@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网站综合检查脚本
+每个HTML文件只读取解析一次，在同一棵树上依次运行
+seo_check_bespoke、seo_quality_check 和 website_quality_check 的检查
+"""
+
+import os
+from bs4 import BeautifulSoup
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from file_utils import collect_site_paths, iter_html_files
+import seo_check_bespoke
+import seo_quality_check
+import website_quality_check
+
+# 两个质量检查脚本只检查博客目录下的文章
+BLOG_DIR = 'blog'
+
+def check_file(file_path, site_paths):
+    """对单个文件运行三组检查，返回 (路径, SEO问题, SEO质量问题, 网站质量问题)；不在检查范围内的一组为 None"""
+    file_path = os.path.normpath(file_path)
+    in_blog = os.path.dirname(file_path) == BLOG_DIR
+    check_quality = in_blog and os.path.basename(file_path) != 'index.html'
+    
+    try:
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        soup = BeautifulSoup(raw.decode('utf-8'), 'lxml')
+    except Exception:
+        # 读取或解码失败时交给各脚本自己的入口，按各自的方式处理和报告错误
+        return (file_path,
+                seo_check_bespoke.check_seo_issues(file_path),
+                seo_quality_check.check_seo_elements(file_path, site_paths) if check_quality else None,
+                website_quality_check.check_single_file(file_path) if in_blog else None)
+    
+    return (file_path,
+            seo_check_bespoke.check_parsed_page(raw, soup),
+            seo_quality_check.check_parsed_page(file_path, raw, soup, site_paths) if check_quality else None,
+            website_quality_check.check_parsed_page(soup) if in_blog else None)
+
+def print_issue_counts(issue_counts, limit=None):
+    """按出现次数从多到少打印问题统计"""
+    for issue, count in issue_counts.most_common(limit):
+        print(f"  - {issue}: {count}次")
+
+def main():
+    """主函数"""
+    seo_results = {}
+    quality_results = {}
+    website_results = {}
+    
+    print("开始网站综合检查...")
+    print("=" * 50)
+    
+    html_files = list(iter_html_files(os.curdir))
+    site_paths = collect_site_paths(os.curdir)
+    
+    # 多进程并行检查，结果按文件顺序返回
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for file_path, seo_issues, quality_issues, website_issues in executor.map(
+                check_file, html_files, repeat(site_paths), chunksize=16):
+            seo_results[file_path] = seo_issues
+            if quality_issues is not None:
+                quality_results[file_path] = quality_issues
+            if website_issues is not None:
+                website_results[file_path] = website_issues
+    
+    # SEO检查（全站）
+    seo_problem_files = sum(1 for issues in seo_results.values() if issues)
+    print(f"\n=== SEO检查（全站） ===")
+    print(f"总文件数: {len(seo_results)}")
+    print(f"有问题的文件数: {seo_problem_files}")
+    print_issue_counts(Counter(chain.from_iterable(seo_results.values())))
+    
+    # SEO质量检查（博客文章）
+    quality_problem_files = sum(1 for issues in quality_results.values() if issues)
+    print(f"\n=== SEO质量检查（博客文章） ===")
+    print(f"总文件数: {len(quality_results)}")
+    print(f"有问题的文件: {quality_problem_files}")
+    print_issue_counts(Counter(chain.from_iterable(quality_results.values())))
+    
+    # 网站质量检查（博客文章）
+    website_problem_files = sum(1 for file_issues in website_results.values()
+                                if any(issues for issues in file_issues.values()))
+    print(f"\n=== 网站质量检查（博客文章） ===")
+    print(f"总文件数: {len(website_results)}")
+    print(f"有问题的文件: {website_problem_files}")
+    for category in ('performance', 'accessibility', 'content', 'mobile'):
+        issue_counts = Counter(chain.from_iterable(file_issues[category] for file_issues in website_results.values()))
+        if issue_counts:
+            print(f"\n{category.upper()} ({sum(issue_counts.values())}个问题):")
+            print_issue_counts(issue_counts, 5)
+    
+    print("\n网站综合检查完成！")
+    
+    return seo_problem_files + quality_problem_files + website_problem_files == 0
+
+if __name__ == '__main__':
+    main()
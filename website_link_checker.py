@@ -3,14 +3,87 @@
 """
 网站链接检查器
 检查网站中的所有链接是否正常工作，检测404错误和其他问题
+加 --external 参数运行时还会并发请求外部链接检查其状态（需要安装 aiohttp）
 """
 
 import os
 import re
+import sys
 import json
+import asyncio
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+from lxml import etree
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from file_utils import collect_site_paths, iter_html_files
+
+# aiohttp 只用于可选的外部链接检查，未安装时跳过该项
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# 外部链接检查的最大并发请求数和单个请求的超时（秒）
+EXTERNAL_CONCURRENCY = 64
+EXTERNAL_TIMEOUT = 10
+
+# 不支持HEAD请求的服务器返回这些状态码，改用GET重试
+HEAD_NOT_ALLOWED = {405, 501}
+
+# 外部、锚点、邮件和电话链接都不对应站内文件，一次 startswith 判断即可跳过
+EXTERNAL_SCHEMES = ('http://', 'https://')
+NON_FILE_PREFIXES = EXTERNAL_SCHEMES + ('#', 'mailto:', 'tel:')
+
+# 链接只来自这几种标签；直接遍历 lxml 的元素树，省去 BeautifulSoup 包装节点的开销
+LINK_TAGS = ('a', 'link', 'img', 'script')
+
+def extract_links_from_file(file_path):
+    """从HTML文件中提取所有链接，返回 (链接列表, 错误信息)；模块级函数以便在子进程中运行"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # 空文档解析结果为 None
+        root = etree.fromstring(content, etree.HTMLParser())
+        links = []
+        if root is None:
+            return links, None
+        
+        # 提取所有链接，按文档顺序
+        for tag in root.iter(*LINK_TAGS):
+            if tag.tag == 'a' and tag.get('href'):
+                links.append(('href', tag.get('href')))
+            elif tag.tag == 'link' and tag.get('href'):
+                links.append(('href', tag.get('href')))
+            elif tag.tag == 'img' and tag.get('src'):
+                links.append(('src', tag.get('src')))
+            elif tag.tag == 'script' and tag.get('src'):
+                links.append(('src', tag.get('src')))
+        
+        return links, None
+        
+    except Exception as e:
+        return [], str(e)
+
+async def fetch_link_status(url, session, semaphore):
+    """请求单个外部链接，返回 (链接, 状态码, 错误信息)"""
+    async with semaphore:
+        try:
+            async with session.head(url, allow_redirects=True) as response:
+                status = response.status
+            if status in HEAD_NOT_ALLOWED:
+                async with session.get(url, allow_redirects=True) as response:
+                    status = response.status
+            return url, status, None
+        except Exception as e:
+            return url, None, str(e) or type(e).__name__
+
+async def fetch_link_statuses(urls):
+    """共用一个连接池并发请求所有外部链接，同时进行的请求数不超过 EXTERNAL_CONCURRENCY"""
+    semaphore = asyncio.Semaphore(EXTERNAL_CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(total=EXTERNAL_TIMEOUT)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        return await asyncio.gather(*(fetch_link_status(url, session, semaphore) for url in urls))
 
 class WebsiteLinkChecker:
     def __init__(self, root_dir):
@@ -21,7 +94,11 @@ class WebsiteLinkChecker:
         self.all_links = set()
         self.internal_links = set()
         self.external_links = set()
+        # 每个外部链接首次出现的文件，用于问题报告中的来源
+        self.external_sources = {}
         self.missing_files = set()
+        # 站点文件和目录的相对路径集合，链接目标只查集合而不逐个stat
+        self.site_files, self.site_dirs = collect_site_paths(root_dir)
         
     def is_html_file(self, file_path):
         """检查是否为HTML文件"""
@@ -29,64 +106,32 @@ class WebsiteLinkChecker:
     
     def get_all_html_files(self):
         """获取所有HTML文件"""
-        html_files = []
-        for root, dirs, files in os.walk(self.root_dir):
-            # 跳过隐藏目录和不需要的目录
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['__pycache__', 'node_modules']]
-            
-            for file in files:
-                if self.is_html_file(file):
-                    file_path = os.path.join(root, file)
-                    html_files.append(file_path)
-        return html_files
-    
-    def extract_links_from_file(self, file_path):
-        """从HTML文件中提取所有链接"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            soup = BeautifulSoup(content, 'html.parser')
-            links = []
-            
-            # 提取所有链接
-            for tag in soup.find_all(['a', 'link', 'img', 'script']):
-                if tag.name == 'a' and tag.get('href'):
-                    links.append(('href', tag.get('href')))
-                elif tag.name == 'link' and tag.get('href'):
-                    links.append(('href', tag.get('href')))
-                elif tag.name == 'img' and tag.get('src'):
-                    links.append(('src', tag.get('src')))
-                elif tag.name == 'script' and tag.get('src'):
-                    links.append(('src', tag.get('src')))
-            
-            return links
-            
-        except Exception as e:
-            self.issues.append({
-                'type': 'file_read_error',
-                'file': file_path,
-                'error': str(e)
-            })
-            return []
+        # os.scandir 的目录项自带类型信息，跳过隐藏目录和不需要的目录
+        return list(iter_html_files(self.root_dir))
+    
+    def path_kind(self, path):
+        """返回路径类型：'file'、'dir' 或 None（不存在）；站内路径只查集合，站外路径仍查询文件系统"""
+        rel_path = os.path.relpath(path, self.root_dir)
+        if rel_path == os.pardir or rel_path.startswith(os.pardir + os.sep):
+            if os.path.isdir(path):
+                return 'dir'
+            return 'file' if os.path.exists(path) else None
+        
+        if rel_path in self.site_dirs:
+            return 'dir'
+        return 'file' if rel_path in self.site_files else None
     
     def is_internal_link(self, link):
         """判断是否为内部链接"""
-        if link.startswith('http://') or link.startswith('https://'):
+        if link.startswith(EXTERNAL_SCHEMES):
             parsed = urlparse(link)
             return parsed.netloc in ['bespoke-bags.com', 'www.bespoke-bags.com']
         return True  # 相对链接视为内部链接
     
     def resolve_link_path(self, link, current_file):
         """解析链接的实际文件路径"""
-        if link.startswith('http://') or link.startswith('https://'):
-            return None  # 外部链接
-        
-        if link.startswith('#'):
-            return None  # 锚点链接
-        
-        if link.startswith('mailto:') or link.startswith('tel:'):
-            return None  # 邮件和电话链接
+        if link.startswith(NON_FILE_PREFIXES):
+            return None  # 外部、锚点、邮件和电话链接
         
         # 移除查询参数和锚点
         link = link.split('?')[0].split('#')[0]
@@ -108,18 +153,23 @@ class WebsiteLinkChecker:
         target_path = os.path.normpath(target_path)
         
         # 如果链接指向目录，检查是否有index.html
-        if os.path.isdir(target_path):
+        if self.path_kind(target_path) == 'dir':
             index_path = os.path.join(target_path, 'index.html')
-            if os.path.exists(index_path):
+            if self.path_kind(index_path):
                 return index_path
             else:
                 return target_path  # 目录存在但没有index.html
         
         return target_path
     
-    def check_file_links(self, file_path):
-        """检查单个文件中的所有链接"""
-        links = self.extract_links_from_file(file_path)
+    def record_file_result(self, file_path, links, error):
+        """汇总单个文件的链接：记录读取错误，逐个检查提取出的链接"""
+        if error:
+            self.issues.append({
+                'type': 'file_read_error',
+                'file': file_path,
+                'error': error
+            })
         
         for link_type, link in links:
             self.all_links.add(link)
@@ -131,7 +181,8 @@ class WebsiteLinkChecker:
                 target_path = self.resolve_link_path(link, file_path)
                 
                 if target_path:
-                    if not os.path.exists(target_path):
+                    target_kind = self.path_kind(target_path)
+                    if not target_kind:
                         self.missing_files.add(target_path)
                         self.issues.append({
                             'type': 'missing_file',
@@ -140,7 +191,7 @@ class WebsiteLinkChecker:
                             'target_path': target_path,
                             'link_type': link_type
                         })
-                    elif os.path.isdir(target_path):
+                    elif target_kind == 'dir':
                         # 目录存在但没有index.html
                         self.issues.append({
                             'type': 'missing_index',
@@ -151,17 +202,48 @@ class WebsiteLinkChecker:
                         })
             else:
                 self.external_links.add(link)
+                self.external_sources.setdefault(link, file_path)
+    
+    def check_file_links(self, file_path):
+        """检查单个文件中的所有链接"""
+        self.record_file_result(file_path, *extract_links_from_file(file_path))
     
-    def check_all_links(self):
-        """检查所有HTML文件中的链接"""
+    def check_external_links(self):
+        """并发请求所有外部链接，请求失败或状态码>=400的记为问题"""
+        if aiohttp is None:
+            print("未安装 aiohttp，跳过外部链接检查")
+            return
+        
+        print(f"检查 {len(self.external_links)} 个外部链接...")
+        for url, status, error in asyncio.run(fetch_link_statuses(sorted(self.external_links))):
+            if error or status >= 400:
+                self.issues.append({
+                    'type': 'broken_external_link',
+                    'source_file': self.external_sources[url],
+                    'link': url,
+                    'status': status,
+                    'error': error
+                })
+    
+    def check_all_links(self, check_external=False):
+        """检查所有HTML文件中的链接；check_external 为真时最后再检查外部链接"""
         html_files = self.get_all_html_files()
         
         print(f"找到 {len(html_files)} 个HTML文件")
         
-        for file_path in html_files:
-            print(f"检查文件: {os.path.relpath(file_path, self.root_dir)}")
-            self.check_file_links(file_path)
-            self.checked_files.add(file_path)
+        # 多进程并行解析提取链接，在主进程中按文件顺序检查目标路径并汇总
+        # 逐文件的进度行先收集起来，最后一次写出，避免每个文件都单独刷新输出
+        out = []
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = executor.map(extract_links_from_file, html_files, chunksize=16)
+            for file_path, (links, error) in zip(html_files, results):
+                out.append(f"检查文件: {os.path.relpath(file_path, self.root_dir)}\n")
+                self.record_file_result(file_path, links, error)
+                self.checked_files.add(file_path)
+        sys.stdout.write(''.join(out))
+        
+        if check_external:
+            self.check_external_links()
     
     def generate_report(self):
         """生成检查报告"""
@@ -213,13 +295,13 @@ class WebsiteLinkChecker:
             for i, missing_file in enumerate(list(self.missing_files)[:10]):
                 print(f"  {i+1}. {os.path.relpath(missing_file, self.root_dir)}")
 
-def main():
+def main(check_external=False):
     root_dir = os.path.dirname(os.path.abspath(__file__))
     
     print(f"开始检查网站: {root_dir}")
     
     checker = WebsiteLinkChecker(root_dir)
-    checker.check_all_links()
+    checker.check_all_links(check_external)
     
     # 生成报告
     report = checker.generate_report()
@@ -237,7 +319,7 @@ def main():
     return len(checker.issues) == 0
 
 if __name__ == "__main__":
-    success = main()
+    success = main('--external' in sys.argv[1:])
     if not success:
         print("\n发现链接问题，请检查报告文件获取详细信息。")
     else:
@@ -7,19 +7,28 @@
 
 import os
 import re
+import sys
 from bs4 import BeautifulSoup
 import json
+from collections import Counter
 from urllib.parse import urljoin, urlparse
+from concurrent.futures import ProcessPoolExecutor
 
-def check_page_performance(file_path):
+# 预编译的匹配模式，每个文件都会用到
+CONTENT_CLASS_RE = re.compile(r'content|post|article')
+FIXED_WIDTH_RE = re.compile(r'width\s*:\s*\d+px')
+SMALL_FONT_RE = re.compile(r'font-size\s*:\s*(\d+)px')
+# 未优化图片格式，一次扫描同时匹配所有扩展名
+RASTER_IMAGE_RE = re.compile(r'\.(?:jpe?g|png)', re.I)
+
+# 通用链接文本是整段文本精确匹配，用集合做常数时间查找
+GENERIC_LINK_TEXTS = frozenset(['click here', 'read more', 'more', 'here', '点击这里', '更多', '阅读更多'])
+
+def check_page_performance(soup, images, inline_styles):
     """检查页面性能相关指标"""
     issues = []
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            soup = BeautifulSoup(content, 'html.parser')
-        
         # 检查CSS文件数量
         css_links = soup.find_all('link', rel='stylesheet')
         if len(css_links) > 3:
@@ -31,19 +40,17 @@ def check_page_performance(file_path):
             issues.append(f"JavaScript文件过多({len(js_scripts)}个)")
         
         # 检查图片优化
-        images = soup.find_all('img')
         large_images = []
         for img in images:
             src = img.get('src', '')
             if src and not src.endswith('.webp') and not src.startswith('data:'):
-                if any(ext in src.lower() for ext in ['.jpg', '.jpeg', '.png']):
+                if RASTER_IMAGE_RE.search(src):
                     large_images.append(src)
         
         if large_images:
             issues.append(f"发现{len(large_images)}张未优化图片(非WebP格式)")
         
         # 检查内联样式
-        inline_styles = soup.find_all(attrs={'style': True})
         if len(inline_styles) > 10:
             issues.append(f"内联样式过多({len(inline_styles)}个)，建议移至CSS文件")
         
@@ -52,17 +59,12 @@ def check_page_performance(file_path):
     
     return issues
 
-def check_accessibility(file_path):
+def check_accessibility(soup, images):
     """检查可访问性"""
     issues = []
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            soup = BeautifulSoup(content, 'html.parser')
-        
         # 检查图片alt属性
-        images = soup.find_all('img')
         missing_alt = [img for img in images if not img.get('alt')]
         if missing_alt:
             issues.append(f"{len(missing_alt)}张图片缺少alt属性")
@@ -96,7 +98,7 @@ def check_accessibility(file_path):
         generic_links = []
         for link in links:
             text = link.get_text().strip().lower()
-            if text in ['click here', 'read more', 'more', 'here', '点击这里', '更多', '阅读更多']:
+            if text in GENERIC_LINK_TEXTS:
                 generic_links.append(text)
         
         if generic_links:
@@ -107,17 +109,13 @@ def check_accessibility(file_path):
     
     return issues
 
-def check_content_quality(file_path):
+def check_content_quality(soup):
     """检查内容质量"""
     issues = []
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            soup = BeautifulSoup(content, 'html.parser')
-        
         # 提取主要内容
-        main_content = soup.find('main') or soup.find('article') or soup.find('div', class_=re.compile(r'content|post|article'))
+        main_content = soup.find('main') or soup.find('article') or soup.find('div', class_=CONTENT_CLASS_RE)
         
         if main_content:
             text_content = main_content.get_text().strip()
@@ -153,15 +151,11 @@ def check_content_quality(file_path):
     
     return issues
 
-def check_mobile_friendliness(file_path):
+def check_mobile_friendliness(soup, inline_styles):
     """检查移动端友好性"""
     issues = []
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            soup = BeautifulSoup(content, 'html.parser')
-        
         # 检查viewport meta标签
         viewport = soup.find('meta', attrs={'name': 'viewport'})
         if not viewport:
@@ -173,20 +167,17 @@ def check_mobile_friendliness(file_path):
         
         # 检查固定宽度元素
         style_tags = soup.find_all('style')
-        inline_styles = soup.find_all(attrs={'style': True})
         
-        fixed_width_pattern = re.compile(r'width\s*:\s*\d+px')
         for tag in style_tags + inline_styles:
             style_content = tag.get('style', '') if hasattr(tag, 'get') else str(tag)
-            if fixed_width_pattern.search(style_content):
+            if FIXED_WIDTH_RE.search(style_content):
                 issues.append("发现固定像素宽度，可能影响移动端显示")
                 break
         
         # 检查字体大小
-        small_font_pattern = re.compile(r'font-size\s*:\s*(\d+)px')
         for tag in style_tags + inline_styles:
             style_content = tag.get('style', '') if hasattr(tag, 'get') else str(tag)
-            matches = small_font_pattern.findall(style_content)
+            matches = SMALL_FONT_RE.findall(style_content)
             for match in matches:
                 if int(match) < 14:
                     issues.append("字体过小，移动端可读性差")
@@ -197,17 +188,38 @@ def check_mobile_friendliness(file_path):
     
     return issues
 
-def check_single_file(file_path):
-    """检查单个文件的所有质量指标"""
+def check_parsed_page(soup):
+    """在已解析的完整文档上运行所有质量检查，返回按类别分组的问题"""
+    # 多项检查都要用到的标签只查找一次
+    images = soup.find_all('img')
+    inline_styles = soup.find_all(attrs={'style': True})
+    
     all_issues = {
-        'performance': check_page_performance(file_path),
-        'accessibility': check_accessibility(file_path),
-        'content': check_content_quality(file_path),
-        'mobile': check_mobile_friendliness(file_path)
+        'performance': check_page_performance(soup, images, inline_styles),
+        'accessibility': check_accessibility(soup, images),
+        'content': check_content_quality(soup),
+        'mobile': check_mobile_friendliness(soup, inline_styles)
     }
     
     return all_issues
 
+def check_single_file(file_path):
+    """检查单个文件的所有质量指标；文件只读取解析一次，各项检查共用同一棵树"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        soup = BeautifulSoup(content, 'lxml')
+    except Exception as e:
+        # 读取或解析失败时每项检查都报告同一错误，与各自读取文件时一致
+        return {
+            'performance': [f"性能检查错误: {str(e)}"],
+            'accessibility': [f"可访问性检查错误: {str(e)}"],
+            'content': [f"内容质量检查错误: {str(e)}"],
+            'mobile': [f"移动端检查错误: {str(e)}"]
+        }
+    
+    return check_parsed_page(soup)
+
 def main():
     """主函数"""
     directories_to_check = ['blog']
@@ -222,32 +234,39 @@ def main():
     
     print("开始网站质量检查...\n")
     
+    filenames = []
+    file_paths = []
     for directory in directories_to_check:
         if not os.path.exists(directory):
             continue
             
         for filename in os.listdir(directory):
             if filename.endswith('.html'):
-                file_path = os.path.join(directory, filename)
-                total_files += 1
-                
-                file_issues = check_single_file(file_path)
-                
-                has_issues = any(issues for issues in file_issues.values())
+                filenames.append(filename)
+                file_paths.append(os.path.join(directory, filename))
+    
+    # 多进程并行检查，结果按文件顺序返回
+    # 逐文件的输出先收集起来，最后一次写出，避免每行都单独刷新输出
+    out = []
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for filename, file_issues in zip(filenames, executor.map(check_single_file, file_paths, chunksize=16)):
+            total_files += 1
+            
+            has_issues = any(issues for issues in file_issues.values())
+            
+            if has_issues:
+                files_with_issues += 1
+                out.append(f"⚠️  {filename}:\n")
                 
-                if has_issues:
-                    files_with_issues += 1
-                    print(f"⚠️  {filename}:")
-                    
-                    for category, issues in file_issues.items():
-                        if issues:
-                            print(f"  {category.upper()}:")
-                            for issue in issues:
-                                print(f"    - {issue}")
-                                all_issues[category].append(issue)
-                    print()
-                else:
-                    print(f"✅ {filename}: 质量检查通过")
+                for category, issues in file_issues.items():
+                    if issues:
+                        out.append(f"  {category.upper()}:\n")
+                        out.extend(f"    - {issue}\n" for issue in issues)
+                        all_issues[category].extend(issues)
+                out.append("\n")
+            else:
+                out.append(f"✅ {filename}: 质量检查通过\n")
+    sys.stdout.write(''.join(out))
     
     # 输出总结
     print(f"\n=== 网站质量检查总结 ===")
@@ -259,11 +278,7 @@ def main():
     for category, issues in all_issues.items():
         if issues:
             print(f"\n{category.upper()} ({len(issues)}个问题):")
-            issue_counts = {}
-            for issue in issues:
-                issue_counts[issue] = issue_counts.get(issue, 0) + 1
-            
-            for issue, count in sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)[:5]:
+            for issue, count in Counter(issues).most_common(5):
                 print(f"  - {issue}: {count}次")
     
     return files_with_issues == 0